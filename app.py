@@ -1,13 +1,18 @@
 import os
 import time
+import asyncio
 import logging
+import math
+import itertools
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 from utils import TallyDataExtractor, TallyConnectionError
@@ -21,20 +26,45 @@ TALLY_COMPANY = os.getenv("TALLY_COMPANY", "Nimona")
 TALLY_ODBC_DSN = os.getenv("TALLY_ODBC_DSN", "TallyODBC_9000")
 TALLY_FY_START = os.getenv("TALLY_FY_START", "20250401")
 TALLY_FY_END = os.getenv("TALLY_FY_END", "20260331")
+MASTERS_CACHE_TTL = int(os.getenv("TALLY_MASTERS_CACHE_TTL", "300"))
+# Directory for the on-disk masters snapshot shared across restarts/workers;
+# empty disables it
+TALLY_CACHE_DIR = os.getenv("TALLY_CACHE_DIR", "")
+# "1" tries the smaller CSV ledger export first (not yet confirmed against a
+# real TallyPrime); by default ledgers come from the XML export
+TALLY_LEDGER_CSV = os.getenv("TALLY_LEDGER_CSV", "0") == "1"
 
 logger = logging.getLogger("TallyAPI")
 
+# ============================================================================
+# RESPONSE CLOCK
+# ============================================================================
+
+# Response timestamps come from this value, refreshed every 100 ms by a
+# background task started in lifespan, instead of formatting the wall clock
+# on every response.
+_NOW_ISO = datetime.now().isoformat()
+
+async def _tick_clock():
+    global _NOW_ISO
+    while True:
+        _NOW_ISO = datetime.now().isoformat()
+        await asyncio.sleep(0.1)
+
 # ============================================================================
 # RESPONSE MODEL
 # ============================================================================
 
+# Envelope for every response. Success paths emit the same shape as a plain
+# dict (see api_response); error paths use model_construct() since every
+# field is set by us and needs no validation.
 class APIResponse(BaseModel):
     success: bool
     data: Any = None
     error: Optional[str] = None
     count: Optional[int] = None
     extraction_method: Optional[str] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = Field(default_factory=lambda: _NOW_ISO)
 
 # ============================================================================
 # EXTRACTOR SINGLETON
@@ -49,19 +79,96 @@ def get_extractor() -> TallyDataExtractor:
             url=TALLY_URL, company_name=TALLY_COMPANY,
             odbc_dsn=TALLY_ODBC_DSN,
             financial_year_start=TALLY_FY_START, financial_year_end=TALLY_FY_END,
+            cache_dir=TALLY_CACHE_DIR or None, ledger_csv=TALLY_LEDGER_CSV,
         )
     return _extractor
 
 def reset_extractor(company_name=None, url=None, force_odbc=False):
     global _extractor
+    # Cached masters belong to the previous company/URL — drop them all.
+    _masters_cache.clear()
+    if _extractor is not None:
+        # In-flight calls finish normally; their sockets close on release.
+        _extractor.close()
     _extractor = TallyDataExtractor(
         url=url or TALLY_URL, company_name=company_name or TALLY_COMPANY,
         odbc_dsn=TALLY_ODBC_DSN,
         financial_year_start=TALLY_FY_START, financial_year_end=TALLY_FY_END,
-        force_odbc=force_odbc,
+        force_odbc=force_odbc, cache_dir=TALLY_CACHE_DIR or None,
+        ledger_csv=TALLY_LEDGER_CSV,
     )
     return _extractor
 
+async def current_extractor() -> TallyDataExtractor:
+    """
+    FastAPI dependency resolving the active extractor once per request.
+    Declared async so FastAPI calls it inline rather than via the threadpool.
+    """
+    return get_extractor()
+
+async def _call(fn, *args, **kwargs):
+    """
+    Run a blocking extractor call (HTTP to Tally / ODBC) in a worker thread
+    so one slow Tally round trip doesn't stall the event loop for everyone.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+# ============================================================================
+# REQUEST COALESCING (single-flight)
+# ============================================================================
+#
+# When several clients ask for the same data at once (e.g. dashboard tabs
+# polling /ledgers together), only the first caller hits Tally; the rest
+# await the same in-flight future.
+# ============================================================================
+
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+async def singleflight(key: tuple, coro_factory):
+    """Await coro_factory() once per key, sharing the result with concurrent callers."""
+    fut = _inflight.get(key)
+    if fut is None:
+        fut = asyncio.ensure_future(coro_factory())
+        _inflight[key] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: one client disconnecting must not cancel the call for the others
+    return await asyncio.shield(fut)
+
+async def shared_call(ext: TallyDataExtractor, method_name: str, *args, **kwargs):
+    """Run ext.<method_name>(*args, **kwargs) in a thread, coalescing identical concurrent calls."""
+    # url too: after reset_extractor points at another Tally, a call still in
+    # flight for the old host must not answer the new host's callers
+    key = (ext.url, ext.company_name, method_name, args, tuple(sorted(kwargs.items())))
+    return await singleflight(key, lambda: _call(getattr(ext, method_name), *args, **kwargs))
+
+# ============================================================================
+# MASTERS CACHE
+# ============================================================================
+#
+# Masters (companies, groups, cost centres, ledger lists by group) change
+# rarely, so idempotent endpoints serve them from a small in-process TTL
+# cache keyed by (Tally url, company, extractor method). Vouchers, debtors/creditors,
+# trial balance and anything taking date params are NOT cached here.
+# ============================================================================
+
+_masters_cache: Dict[tuple, tuple] = {}
+
+async def cached_masters(ext: TallyDataExtractor, method_name: str):
+    """Call ext.<method_name>() through the masters TTL cache."""
+    key = (ext.url, ext.company_name, method_name)
+    hit = _masters_cache.get(key)
+    now = time.monotonic()
+    if hit is not None and now - hit[0] < MASTERS_CACHE_TTL:
+        return hit[1]
+    data = await shared_call(ext, method_name)
+    _masters_cache[key] = (now, data)
+    return data
+
+def drop_cached_masters(ext: TallyDataExtractor):
+    """Forget every cached master for ext's Tally url/company (after a forced refresh)."""
+    for key in [k for k in _masters_cache if k[:2] == (ext.url, ext.company_name)]:
+        _masters_cache.pop(key, None)
+
 # ============================================================================
 # APP
 # ============================================================================
@@ -69,14 +176,18 @@ def reset_extractor(company_name=None, url=None, force_odbc=False):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting TruGenie Tally API...")
+    clock = asyncio.create_task(_tick_clock())
     ext = get_extractor()
-    conn = ext.test_connection()
+    conn = await _call(ext.test_connection)
     method = conn.get("active_method", "none")
     if not method:
         logger.warning("Startup: No connection to Tally (XML API and ODBC both unavailable).")
     else:
         logger.info("Startup connection: %s", method)
     yield
+    clock.cancel()
+    if _extractor is not None:
+        _extractor.close()
     logger.info("Shutting down.")
 
 app = FastAPI(
@@ -84,47 +195,86 @@ app = FastAPI(
     description="REST API for Tally Prime data extraction. Vouchers use Export Data format.",
     version="1.3.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
 
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True,
                    allow_methods=["*"], allow_headers=["*"])
+# Voucher/export JSON compresses ~10x; small health/master replies are left alone
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-def api_response(data, count=None):
-    ext = get_extractor()
-    return APIResponse(
-        success=True, data=data,
-        count=count if count is not None else (len(data) if isinstance(data, list) else None),
-        extraction_method=ext.get_extraction_method(),
+def api_response(ext: TallyDataExtractor, data, count=None):
+    """
+    Build the success envelope as a plain dict and return it pre-rendered.
+    Returning a Response skips FastAPI's jsonable_encoder walk over `data`,
+    which dominates on large voucher/ledger lists. Shape matches APIResponse.
+
+    `count` defaults to len(data) for list payloads only. Endpoints that wrap
+    their records in a dict must pass `count` explicitly (the number of
+    records, not the number of keys), otherwise it is reported as null.
+    """
+    return ORJSONResponse({
+        "success": True,
+        "data": data,
+        "error": None,
+        "count": count if count is not None else (len(data) if isinstance(data, list) else None),
+        # Read the cached enum directly; it's a str Enum, orjson emits its value
+        "extraction_method": ext._method,
+        "timestamp": _NOW_ISO,
+    })
+
+# The extractor hands back the same ledger list object until its cache
+# refreshes, so the encoded list is kept next to the object it came from and
+# spliced into the envelope while that object is still the one being served.
+_rendered_ledgers: Optional[tuple] = None
+
+def ledgers_response(ext: TallyDataExtractor, ledgers: List[Dict]):
+    """api_response for the full ledger list, encoding it once per refresh."""
+    global _rendered_ledgers
+    hit = _rendered_ledgers
+    if hit is None or hit[0] is not ledgers:
+        hit = _rendered_ledgers = (ledgers, orjson.dumps(ledgers))
+    return Response(
+        b'{"success":true,"data":%b,"error":null,"count":%d,"extraction_method":%b,"timestamp":%b}'
+        % (hit[1], len(ledgers), orjson.dumps(ext._method), orjson.dumps(_NOW_ISO)),
+        media_type="application/json",
     )
 
 def handle_error(exc, context):
     logger.exception("Error in %s: %s", context, exc)
     status = 503 if isinstance(exc, TallyConnectionError) else 500
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status,
-        content=APIResponse(success=False, error=f"{context}: {str(exc)}").model_dump(),
+        content=APIResponse.model_construct(success=False, error=f"{context}: {str(exc)}").model_dump(),
     )
 
 # ============================================================================
 # HEALTH & CONFIG
 # ============================================================================
 
+# Constant payloads are encoded once at import; liveness checks are the
+# highest-QPS endpoints and shouldn't pay for JSON encoding every time.
+_ROOT_BYTES = orjson.dumps({"api": "TruGenie Tally Integration", "version": "1.3.0", "docs": "/docs"})
+_HEALTH_STATIC = {"tally_url": TALLY_URL, "company": TALLY_COMPANY}
+
 @app.get("/", tags=["Health"])
 async def root():
-    return {"api": "TruGenie Tally Integration", "version": "1.3.0", "docs": "/docs"}
+    return Response(_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health", tags=["Health"])
-async def health_check():
-    ext = get_extractor()
-    conn = ext.test_connection()
-    return {
+async def health_check(
+    fresh: bool = Query(False, description="Bypass the 5 s probe cache and re-test Tally now"),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
+    conn = await _call(ext.test_connection, force=fresh)
+    return ORJSONResponse({
         "status": "healthy" if conn["active_method"] else "unhealthy",
-        "tally_url": TALLY_URL, "company": TALLY_COMPANY,
+        **_HEALTH_STATIC,
         "xml_api": conn["xml_api"], "odbc": conn["odbc"],
         "active_method": conn["active_method"],
-    }
+    })
 
 @app.post("/config/switch-company", tags=["Config"])
 async def switch_company(
@@ -140,7 +290,7 @@ async def switch_company(
     - Returns connected=false with a clear warning if neither method works.
     """
     ext = reset_extractor(company_name=company_name, url=tally_url, force_odbc=force_odbc)
-    conn = ext.test_connection()
+    conn = await _call(ext.test_connection)
     active = conn.get("active_method")
     used_fallback = False
 
@@ -153,7 +303,7 @@ async def switch_company(
             company_name,
         )
         ext = reset_extractor(company_name=company_name, url=tally_url, force_odbc=False)
-        conn = ext.test_connection()
+        conn = await _call(ext.test_connection)
         active = conn.get("active_method")
         used_fallback = True
 
@@ -185,19 +335,19 @@ async def switch_company(
 # ============================================================================
 
 @app.get("/companies", tags=["Company"])
-async def get_companies():
+async def get_companies(ext: TallyDataExtractor = Depends(current_extractor)):
     """
     Returns the list of companies open in Tally.
     Returns HTTP 503 with a clear error message if Tally is not running.
     """
     try:
-        companies = get_extractor().get_company_list()
-        return api_response(companies, count=len(companies))
+        companies = await cached_masters(ext, "get_company_list")
+        return api_response(ext, companies, count=len(companies))
     except TallyConnectionError as exc:
         # Tally is offline — return 503 Service Unavailable, not 200 with empty data
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
-            content=APIResponse(
+            content=APIResponse.model_construct(
                 success=False,
                 error=str(exc),
                 data=None,
@@ -208,13 +358,13 @@ async def get_companies():
         return handle_error(exc, "get_companies")
 
 @app.get("/company/info", tags=["Company"])
-async def get_company_info():
+async def get_company_info(ext: TallyDataExtractor = Depends(current_extractor)):
     try:
-        return api_response(get_extractor().get_company_info())
+        return api_response(ext, await cached_masters(ext, "get_company_info"))
     except TallyConnectionError as exc:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
-            content=APIResponse(success=False, error=str(exc)).model_dump(),
+            content=APIResponse.model_construct(success=False, error=str(exc)).model_dump(),
         )
     except Exception as exc:
         return handle_error(exc, "get_company_info")
@@ -224,49 +374,62 @@ async def get_company_info():
 # ============================================================================
 
 @app.get("/ledgers", tags=["Ledgers"])
-async def get_all_ledgers(refresh: bool = Query(False)):
+async def get_all_ledgers(
+    refresh: bool = Query(False),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
     try:
-        return api_response(get_extractor().get_all_ledgers(force_refresh=refresh))
+        ledgers = await shared_call(ext, "get_all_ledgers", force_refresh=refresh)
+        if refresh:
+            # The ledger lists by group below were derived from the old data
+            drop_cached_masters(ext)
+        return ledgers_response(ext, ledgers)
     except Exception as exc:
         return handle_error(exc, "get_all_ledgers")
 
 @app.get("/ledgers/search", tags=["Ledgers"])
-async def search_ledger(name: str = Query(...)):
+async def search_ledger(
+    name: str = Query(...),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
     try:
-        ledger = get_extractor().get_ledger_by_name(name)
+        ledger = await _call(ext.get_ledger_by_name, name)
         if not ledger:
             raise HTTPException(status_code=404, detail=f"Ledger '{name}' not found")
-        return api_response(ledger)
+        return api_response(ext, ledger)
     except HTTPException:
         raise
     except Exception as exc:
         return handle_error(exc, "search_ledger")
 
 @app.get("/ledgers/group/{group_name}", tags=["Ledgers"])
-async def get_ledgers_by_group(group_name: str):
+async def get_ledgers_by_group(
+    group_name: str,
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
     try:
-        return api_response(get_extractor().get_ledgers_by_group(group_name))
+        return api_response(ext, await _call(ext.get_ledgers_by_group, group_name))
     except Exception as exc:
         return handle_error(exc, "get_ledgers_by_group")
 
 @app.get("/ledgers/bank-accounts", tags=["Ledgers"])
-async def get_bank_accounts():
-    try: return api_response(get_extractor().get_bank_accounts())
+async def get_bank_accounts(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_bank_accounts"))
     except Exception as exc: return handle_error(exc, "get_bank_accounts")
 
 @app.get("/ledgers/cash-accounts", tags=["Ledgers"])
-async def get_cash_accounts():
-    try: return api_response(get_extractor().get_cash_accounts())
+async def get_cash_accounts(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_cash_accounts"))
     except Exception as exc: return handle_error(exc, "get_cash_accounts")
 
 @app.get("/ledgers/fixed-assets", tags=["Ledgers"])
-async def get_fixed_assets():
-    try: return api_response(get_extractor().get_fixed_assets())
+async def get_fixed_assets(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_fixed_assets"))
     except Exception as exc: return handle_error(exc, "get_fixed_assets")
 
 @app.get("/ledgers/loans", tags=["Ledgers"])
-async def get_loans():
-    try: return api_response(get_extractor().get_loans())
+async def get_loans(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_loans"))
     except Exception as exc: return handle_error(exc, "get_loans")
 
 # ============================================================================
@@ -274,31 +437,43 @@ async def get_loans():
 # ============================================================================
 
 @app.get("/debtors", tags=["Debtors & Creditors"])
-async def get_debtors():
+async def get_debtors(ext: TallyDataExtractor = Depends(current_extractor)):
     try:
-        debtors = get_extractor().get_debtors()
-        total = sum(d.get("closing_balance", 0) for d in debtors)
-        return api_response({"debtors": debtors, "total_receivables": total, "count": len(debtors)})
+        debtors = await shared_call(ext, "get_debtors")
+        total = math.fsum(d.get("closing_balance", 0) for d in debtors)
+        return api_response(
+            ext, {"debtors": debtors, "total_receivables": total, "count": len(debtors)},
+            count=len(debtors),
+        )
     except Exception as exc:
         return handle_error(exc, "get_debtors")
 
 @app.get("/debtors/top", tags=["Debtors & Creditors"])
-async def get_top_debtors(limit: int = Query(10, ge=1, le=100)):
-    try: return api_response(get_extractor().get_top_debtors(limit))
+async def get_top_debtors(
+    limit: int = Query(10, ge=1, le=100),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
+    try: return api_response(ext, await _call(ext.get_top_debtors, limit))
     except Exception as exc: return handle_error(exc, "get_top_debtors")
 
 @app.get("/creditors", tags=["Debtors & Creditors"])
-async def get_creditors():
+async def get_creditors(ext: TallyDataExtractor = Depends(current_extractor)):
     try:
-        creditors = get_extractor().get_creditors()
-        total = sum(c.get("closing_balance", 0) for c in creditors)
-        return api_response({"creditors": creditors, "total_payables": total, "count": len(creditors)})
+        creditors = await shared_call(ext, "get_creditors")
+        total = math.fsum(c.get("closing_balance", 0) for c in creditors)
+        return api_response(
+            ext, {"creditors": creditors, "total_payables": total, "count": len(creditors)},
+            count=len(creditors),
+        )
     except Exception as exc:
         return handle_error(exc, "get_creditors")
 
 @app.get("/creditors/top", tags=["Debtors & Creditors"])
-async def get_top_creditors(limit: int = Query(10, ge=1, le=100)):
-    try: return api_response(get_extractor().get_top_creditors(limit))
+async def get_top_creditors(
+    limit: int = Query(10, ge=1, le=100),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
+    try: return api_response(ext, await _call(ext.get_top_creditors, limit))
     except Exception as exc: return handle_error(exc, "get_top_creditors")
 
 # ============================================================================
@@ -311,6 +486,7 @@ async def get_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     limit: int = Query(500, ge=1, le=10000),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
     """
     Get vouchers filtered by type and/or date range.
@@ -319,26 +495,56 @@ async def get_vouchers(
     guarantee correctness regardless of Tally version behavior.
     """
     try:
-        vouchers = get_extractor().get_vouchers(
+        vouchers = await shared_call(ext, "get_vouchers",
             voucher_type=voucher_type, from_date=from_date, to_date=to_date, limit=limit,
         )
-        return api_response(vouchers)
+        return api_response(ext, vouchers)
     except Exception as exc:
         return handle_error(exc, "get_vouchers")
 
+@app.get("/vouchers/stream", tags=["Vouchers"])
+async def stream_vouchers(
+    voucher_type: Optional[str] = Query(None, description="Sales, Purchase, Receipt, Payment, Journal, Contra"),
+    from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    limit: int = Query(10000, ge=1, le=10000),
+    include_entries: bool = Query(False, description="Include Dr/Cr ledger entries"),
+    ext: TallyDataExtractor = Depends(current_extractor),
+):
+    """
+    Same filters as /vouchers, streamed as NDJSON (one voucher per line).
+
+    Vouchers are serialised as they come off the parser, so large exports
+    start sending immediately and never hold the full list in memory.
+    """
+    try:
+        vouchers = await _call(ext.iter_vouchers,
+            voucher_type=voucher_type, from_date=from_date, to_date=to_date,
+            include_entries=include_entries,
+        )
+    except Exception as exc:
+        return handle_error(exc, "stream_vouchers")
+
+    def gen():
+        for v in itertools.islice(vouchers, limit):
+            yield orjson.dumps(v) + b"\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
 @app.get("/vouchers/details", tags=["Vouchers"])
 async def get_voucher_details(
     voucher_type: Optional[str] = Query(None),
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     limit: int = Query(200, ge=1, le=5000),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
     """Get vouchers WITH line-item Dr/Cr ledger entries."""
     try:
-        vouchers = get_extractor().get_vouchers_with_entries(
+        vouchers = await shared_call(ext, "get_vouchers_with_entries",
             voucher_type=voucher_type, from_date=from_date, to_date=to_date, limit=limit,
         )
-        return api_response(vouchers)
+        return api_response(ext, vouchers)
     except Exception as exc:
         return handle_error(exc, "get_voucher_details")
 
@@ -346,40 +552,45 @@ async def get_voucher_details(
 async def get_sales_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
-    try: return api_response(get_extractor().get_sales_vouchers(from_date, to_date))
+    try: return api_response(ext, await _call(ext.get_sales_vouchers, from_date, to_date))
     except Exception as exc: return handle_error(exc, "get_sales_vouchers")
 
 @app.get("/vouchers/purchases", tags=["Vouchers"])
 async def get_purchase_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
-    try: return api_response(get_extractor().get_purchase_vouchers(from_date, to_date))
+    try: return api_response(ext, await _call(ext.get_purchase_vouchers, from_date, to_date))
     except Exception as exc: return handle_error(exc, "get_purchase_vouchers")
 
 @app.get("/vouchers/receipts", tags=["Vouchers"])
 async def get_receipt_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
-    try: return api_response(get_extractor().get_receipt_vouchers(from_date, to_date))
+    try: return api_response(ext, await _call(ext.get_receipt_vouchers, from_date, to_date))
     except Exception as exc: return handle_error(exc, "get_receipt_vouchers")
 
 @app.get("/vouchers/payments", tags=["Vouchers"])
 async def get_payment_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
-    try: return api_response(get_extractor().get_payment_vouchers(from_date, to_date))
+    try: return api_response(ext, await _call(ext.get_payment_vouchers, from_date, to_date))
     except Exception as exc: return handle_error(exc, "get_payment_vouchers")
 
 @app.get("/vouchers/journals", tags=["Vouchers"])
 async def get_journal_vouchers(
     from_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
     to_date: Optional[str] = Query(None, description="YYYYMMDD or YYYY-MM-DD"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
-    try: return api_response(get_extractor().get_journal_vouchers(from_date, to_date))
+    try: return api_response(ext, await _call(ext.get_journal_vouchers, from_date, to_date))
     except Exception as exc: return handle_error(exc, "get_journal_vouchers")
 
 @app.get("/vouchers/daybook", tags=["Vouchers"])
@@ -388,6 +599,7 @@ async def get_day_book(
         None,
         description="Specific date in YYYYMMDD or YYYY-MM-DD format. Defaults to today.",
     ),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
     """
     Get all vouchers for a specific date (Day Book).
@@ -397,25 +609,30 @@ async def get_day_book(
       Date filtering is enforced in Python to guarantee correct results.
     """
     try:
-        ext = get_extractor()
-        vouchers = ext.get_day_book(date)
+        vouchers = await _call(ext.get_day_book, date)
 
-        from collections import defaultdict
-        by_type = defaultdict(lambda: {"count": 0, "total": 0.0})
+        # Single pass; plain dict avoids a defaultdict factory call per new type.
+        # Totals run in integer paise so they sum exactly.
+        by_type: Dict[str, Dict[str, Any]] = {}
         for v in vouchers:
             t = v.get("voucher_type", "Other")
-            by_type[t]["count"] += 1
-            by_type[t]["total"] += v.get("amount", 0)
+            bucket = by_type.get(t)
+            if bucket is None:
+                bucket = by_type[t] = {"count": 0, "total": 0}
+            bucket["count"] += 1
+            bucket["total"] += round(v.get("amount", 0) * 100)
+        for bucket in by_type.values():
+            bucket["total"] /= 100
 
         # Resolve the actual date used (get_day_book defaults to today)
         resolved_date = date if date else datetime.now().strftime("%Y-%m-%d")
 
-        return api_response({
+        return api_response(ext, {
             "date": resolved_date,
             "vouchers": vouchers,
             "total_vouchers": len(vouchers),
-            "summary_by_type": dict(by_type),
-        })
+            "summary_by_type": by_type,
+        }, count=len(vouchers))
     except Exception as exc:
         return handle_error(exc, "get_day_book")
 
@@ -424,13 +641,13 @@ async def get_day_book(
 # ============================================================================
 
 @app.get("/groups", tags=["Masters"])
-async def get_all_groups():
-    try: return api_response(get_extractor().get_all_groups())
+async def get_all_groups(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_all_groups"))
     except Exception as exc: return handle_error(exc, "get_all_groups")
 
 @app.get("/cost-centres", tags=["Masters"])
-async def get_cost_centres():
-    try: return api_response(get_extractor().get_cost_centres())
+async def get_cost_centres(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_cost_centres"))
     except Exception as exc: return handle_error(exc, "get_cost_centres")
 
 # ============================================================================
@@ -438,28 +655,29 @@ async def get_cost_centres():
 # ============================================================================
 
 @app.get("/reports/financial-summary", tags=["Reports"])
-async def get_financial_summary():
-    try: return api_response(get_extractor().get_financial_summary())
+async def get_financial_summary(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await shared_call(ext, "get_financial_summary"))
     except Exception as exc: return handle_error(exc, "get_financial_summary")
 
 @app.get("/reports/group-summary", tags=["Reports"])
-async def get_group_summary():
-    try: return api_response(get_extractor().get_ledger_summary_by_group())
+async def get_group_summary(ext: TallyDataExtractor = Depends(current_extractor)):
+    try: return api_response(ext, await cached_masters(ext, "get_ledger_summary_by_group"))
     except Exception as exc: return handle_error(exc, "get_group_summary")
 
 @app.get("/reports/trial-balance", tags=["Reports"])
 async def get_trial_balance(
     from_date: Optional[str] = Query(None),
     to_date: Optional[str] = Query(None),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
     try:
-        tb = get_extractor().get_trial_balance(from_date, to_date)
-        total_dr = sum(e.get("debit", 0) for e in tb)
-        total_cr = sum(e.get("credit", 0) for e in tb)
-        return api_response({
+        tb = await shared_call(ext, "get_trial_balance", from_date, to_date)
+        total_dr = math.fsum(e.get("debit", 0) for e in tb)
+        total_cr = math.fsum(e.get("credit", 0) for e in tb)
+        return api_response(ext, {
             "entries": tb, "total_debit": total_dr, "total_credit": total_cr,
             "difference": round(total_dr - total_cr, 2), "is_balanced": abs(total_dr - total_cr) < 1,
-        })
+        }, count=len(tb))
     except Exception as exc:
         return handle_error(exc, "get_trial_balance")
 
@@ -468,12 +686,27 @@ async def get_trial_balance(
 # ============================================================================
 
 @app.get("/export/all", tags=["Export"])
-async def export_all():
+async def export_all(ext: TallyDataExtractor = Depends(current_extractor)):
+    """
+    Full export. The independent Tally fetches run concurrently (see
+    TallyDataExtractor.fetch_all_async), so wall time is the slowest call
+    (usually vouchers) rather than the sum. Trial balance and financial
+    summary are then derived from the ledger cache populated by the ledger
+    fetch.
+    """
     try:
         start = time.time()
-        data = get_extractor().export_all()
+        data = {
+            **await ext.fetch_all_async(),
+            # Off the event loop too: if the ledger cache lapsed meanwhile,
+            # these go back to Tally
+            "trial_balance": await _call(ext.get_trial_balance),
+            "financial_summary": await _call(ext.get_financial_summary),
+            "extraction_timestamp": datetime.now().isoformat(),
+            "extraction_method": ext.get_extraction_method(),
+        }
         data["export_duration_seconds"] = round(time.time() - start, 2)
-        return api_response(data)
+        return api_response(ext, data)
     except Exception as exc:
         return handle_error(exc, "export_all")
 
@@ -484,9 +717,9 @@ async def export_all():
 @app.get("/debug/raw-voucher-xml", tags=["Debug"])
 async def debug_raw_voucher_xml(
     from_date: str = Query("20250401"), to_date: str = Query("20250401"),
+    ext: TallyDataExtractor = Depends(current_extractor),
 ):
     """See raw XML that Tally returns for voucher Collection export."""
-    ext = get_extractor()
     xml_req = f"""
     <ENVELOPE>
         <HEADER>
@@ -516,12 +749,35 @@ async def debug_raw_voucher_xml(
             </DESC>
         </BODY>
     </ENVELOPE>"""
-    raw = ext._execute_request(xml_req, timeout=60)
+    # Stream the response and read only what we show, instead of buffering
+    # the whole (often multi-MB) voucher export just to slice it.
+    resp = await _call(ext._execute_request_stream, xml_req, timeout=60)
+    if resp is None:
+        return PlainTextResponse("No response from Tally", status_code=502)
+    try:
+        raw = await _call(resp.raw.read, 20000)
+    finally:
+        resp.close()
     if raw:
-        return PlainTextResponse(raw[:20000], media_type="application/xml")
+        return PlainTextResponse(raw, media_type="application/xml")
     return PlainTextResponse("No response from Tally", status_code=502)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app:app", host="0.0.0.0", port=8001, reload=True, log_level="info")
+    # Set TALLY_API_RELOAD=0 in production; workers are ignored while reloading.
+    # Each worker keeps its own caches and in-flight map, so extra workers mean
+    # extra load on Tally — scale up only if the API itself is the bottleneck.
+    reload = os.getenv("TALLY_API_RELOAD", "1") == "1"
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8001,
+        reload=reload,
+        workers=None if reload else int(os.getenv("TALLY_API_WORKERS", "1")),
+        # uvloop + httptools when installed via uvicorn[standard] (uvloop is
+        # not available on Windows, where this falls back to asyncio)
+        loop="auto",
+        http="auto",
+        log_level="info",
+    )
@@ -1,13 +1,40 @@
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
 import re
+import io
+import csv
+import codecs
+import asyncio
+import itertools
 import logging
 import json
+import heapq
+import math
 import os
+import sys
 import time
-from typing import Dict, List, Optional, Union, Tuple
+import random
+import threading
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Union, Tuple
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # ============================================================================
 # LOGGING SETUP
@@ -30,6 +57,543 @@ logging.basicConfig(
 logger = logging.getLogger("TallyExtractor")
 
 
+# ============================================================================
+# HTTP SESSION
+# ============================================================================
+#
+# Each extractor owns a pooled session: Tally calls reuse keep-alive sockets
+# instead of paying a TCP handshake per request. An extractor talks to a
+# single Tally host; the pool is sized for the API's worker threads hitting
+# it concurrently (asyncio.to_thread caps out at 32).
+#
+# gzip/deflate is asked for explicitly rather than left to requests' default
+# header (which grows br/zstd when those packages are installed): Tally XML
+# compresses ~10x, and urllib3 inflates it transparently, including for the
+# streamed responses fed to iterparse.
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/xml", "Accept-Encoding": "gzip, deflate"})
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=0))
+    return session
+
+
+# ============================================================================
+# REGEX PATTERNS (compiled once at import)
+# ============================================================================
+
+# Character references the parser would reject: control chars 0-31,
+# surrogates (D800-DFFF), FFFE/FFFF and anything past 10FFFF, in decimal or
+# hex with any zero padding, plus the malformed upper-case &#X..; form.
+# Stripping exactly these up front means a Tally response never needs a
+# second, more aggressive cleaning pass.
+_RE_BAD_CHARREF = re.compile(
+    r'&#(?:'
+    r'0*(?:[12]?[0-9]|3[01]'
+    r'|5529[6-9]|55[3-9][0-9]{2}|56[0-9]{3}|57[0-2][0-9]{2}|573[0-3][0-9]|5734[0-3]'
+    r'|6553[45]'
+    r'|111411[2-9]|11141[2-9][0-9]|1114[2-9][0-9]{2}|111[5-9][0-9]{3}|11[2-9][0-9]{4}'
+    r'|1[2-9][0-9]{5}|[2-9][0-9]{6}|[1-9][0-9]{7,})'
+    r'|x0*(?:1?[0-9a-fA-F]'
+    r'|[dD][89a-fA-F][0-9a-fA-F]{2}|[fF]{3}[eEfF]'
+    r'|1[1-9a-fA-F][0-9a-fA-F]{4}|[2-9a-fA-F][0-9a-fA-F]{5}|[1-9a-fA-F][0-9a-fA-F]{6,})'
+    r'|X[0-9a-fA-F]+'
+    r');'
+)
+
+# Unterminated character reference at the end of a chunk
+_RE_PARTIAL_CHARREF = re.compile(r'&(?:#[xX]?[0-9a-fA-F]*)?\Z')
+
+# Raw control bytes (all of 0x00-0x1F except tab, LF, CR) are just as fatal
+# to the parser. They are deleted from the UTF-8 bytes handed to it with
+# bytes.translate, which is a single C pass; these bytes never occur inside
+# a multi-byte UTF-8 sequence.
+_XML_CTRL_BYTES = bytes(c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+_RE_YYYYMMDD = re.compile(r'^\d{8}$')
+# The other Tally date shapes, each matching one strptime format exactly:
+# d-MMM-YYYY / d-MMM-YY, d/m/YYYY or d-m-YYYY, and YYYY-m-d
+_RE_DATE_DMONY = re.compile(r'^(\d{1,2})-([A-Za-z]{3})-(\d{4}|\d{2})$')
+_RE_DATE_DMY = re.compile(r'^(\d{1,2})([-/])(\d{1,2})\2(\d{4})$')
+_RE_DATE_YMD = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+
+# ============================================================================
+# XML PARSING
+# ============================================================================
+#
+# lxml (libxml2) when installed, stdlib ElementTree otherwise. Responses are
+# handed to the parser as UTF-8 bytes: lxml refuses str input that carries an
+# encoding declaration, and bytes skip a transcoding pass in both backends.
+
+#
+# The lxml parser is built once and reused; lxml serialises concurrent use of
+# a parser internally, so sharing it across the API's worker threads is safe.
+# recover=True is deliberately NOT set: once libxml2 has recovered from a bad
+# character reference it drops every later entity in the document, not just
+# the next one ("<n>&#4;x</n><m>A &amp; B</m>" gives m = "A  B"), and it
+# keeps out-of-range refs such as &#xFFFE; as-is. Invalid refs are stripped
+# by clean_xml / _CleanXMLStream beforehand instead.
+# Tally never sends xml:id attributes or a DTD, so the ID hash table is not
+# built and entities are not expanded (which also shuts out XXE payloads).
+
+_LXML_OPTIONS = dict(
+    huge_tree=True, remove_blank_text=True, collect_ids=False, resolve_entities=False,
+)
+_PARSER = ET.XMLParser(**_LXML_OPTIONS) if HAS_LXML else None
+
+
+def _fromstring(xml_text: str):
+    """Parse a whole Tally response into an element tree."""
+    return ET.fromstring(xml_text.encode("utf-8").translate(None, _XML_CTRL_BYTES), _PARSER)
+
+
+def _iter_tags(root, tags):
+    """
+    Descendants of `root` whose tag is in `tags`, in document order. lxml
+    filters inside libxml2; the stdlib fallback filters in Python.
+    """
+    if HAS_LXML:
+        return root.iter(*tags)
+    return (e for e in root.iter() if e.tag in tags)
+
+
+class _CleanXMLStream:
+    """
+    Read-only file object over a streamed Tally response, for iterparse.
+
+    Decodes with the response charset (as resp.text would), strips invalid
+    character references the same way clean_xml does, and returns UTF-8
+    bytes with raw control characters removed. A trailing "&#..." that may
+    be a reference split across network chunks is held back until the next
+    chunk arrives.
+    """
+
+    def __init__(self, resp: requests.Response, chunk_size: int = 64 * 1024):
+        self._chunks = resp.iter_content(chunk_size)
+        self._decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+        self._tail = ""
+        self._buf = b""
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buf) < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._tail + self._decoder.decode(b"", final=True)
+                self._tail = ""
+                self._eof = True
+            else:
+                text = self._tail + self._decoder.decode(chunk)
+                # Hold back a trailing "&", "&#" or "&#digits" whatever its
+                # length: _RE_BAD_CHARREF allows any zero padding, so a split
+                # reference can start arbitrarily far from the chunk end
+                cut = text.rfind("&")
+                if cut != -1 and _RE_PARTIAL_CHARREF.match(text, cut):
+                    text, self._tail = text[:cut], text[cut:]
+                else:
+                    self._tail = ""
+            self._buf += _RE_BAD_CHARREF.sub('', text).encode("utf-8").translate(None, _XML_CTRL_BYTES)
+
+        if size < 0 or size >= len(self._buf):
+            out, self._buf = self._buf, b""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+def _iter_xml(xml: Union[str, _CleanXMLStream], tag: Optional[str] = None):
+    """
+    Stream elements (all, or only <tag>) out of a Tally response on their
+    end event. Each element is released once the caller moves on, so peak
+    memory is roughly one record instead of the whole DOM, and a caller that
+    stops iterating early never parses the rest of the document.
+
+    `xml` is either the response text or a _CleanXMLStream over a streamed
+    response, in which case parsing overlaps the network read.
+    """
+    if isinstance(xml, str):
+        source = io.BytesIO(xml.encode("utf-8").translate(None, _XML_CTRL_BYTES))
+    else:
+        source = xml
+    if HAS_LXML:
+        for _, elem in ET.iterparse(source, events=("end",), tag=tag, **_LXML_OPTIONS):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    else:
+        for _, elem in ET.iterparse(source, events=("end",)):
+            if tag is None or elem.tag == tag:
+                yield elem
+                elem.clear()
+
+
+# ============================================================================
+# VALUE PARSERS
+# ============================================================================
+#
+# Called once per amount/date field. Tally responses repeat the same strings
+# heavily ("0", "0.00", one date shared by every entry of a voucher, ...),
+# so results are memoised; both return immutable values.
+
+@lru_cache(maxsize=16384)
+def parse_amount(amount_str: str) -> Tuple[float, str]:
+    """
+    Parse Tally amount string to (abs_amount, 'Dr'|'Cr').
+    Tally: Positive = Debit, Negative = Credit
+    """
+    if not amount_str:
+        return 0.0, "Dr"
+
+    cleaned = amount_str.replace(",", "").replace(" ", "").strip()
+
+    if cleaned.upper().endswith("DR"):
+        cleaned = cleaned[:-2].strip()
+        forced_dr = True
+    elif cleaned.upper().endswith("CR"):
+        cleaned = cleaned[:-2].strip()
+        forced_dr = False
+    else:
+        forced_dr = None
+
+    try:
+        val = float(cleaned)
+    except ValueError:
+        return 0.0, "Dr"
+
+    if forced_dr is not None:
+        return abs(val), "Dr" if forced_dr else "Cr"
+
+    if val < 0:
+        return abs(val), "Cr"
+    return val, "Dr"
+
+
+@lru_cache(maxsize=16384)
+def parse_tally_date(date_str: str) -> str:
+    """
+    Parse Tally date to YYYY-MM-DD.
+    Handles: YYYYMMDD, d-MMM-YY, d-MMM-YYYY, DD-MM-YYYY, etc.
+    """
+    if not date_str:
+        return ""
+    date_str = date_str.strip()
+
+    if _RE_YYYYMMDD.match(date_str):
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+
+    # Regex dispatch instead of trying strptime formats until one stops raising
+    m = _RE_DATE_DMONY.match(date_str)
+    if m:
+        month = _MONTHS.get(m.group(2).lower())
+        if month is None:
+            return date_str
+        yy = m.group(3)
+        # %y pivot: 69-99 -> 19xx, 00-68 -> 20xx
+        ymd = (int(yy) if len(yy) == 4 else int(yy) + (1900 if int(yy) >= 69 else 2000),
+               month, int(m.group(1)))
+    else:
+        m = _RE_DATE_DMY.match(date_str)
+        if m:
+            ymd = (int(m.group(4)), int(m.group(3)), int(m.group(1)))
+        else:
+            m = _RE_DATE_YMD.match(date_str)
+            ymd = (int(m.group(1)), int(m.group(2)), int(m.group(3))) if m else None
+
+    if ymd is not None:
+        try:
+            datetime(*ymd)  # reject impossible dates, as strptime would
+        except ValueError:
+            return date_str
+        return "%04d-%02d-%02d" % ymd
+
+    for fmt in ("%d-%b-%Y", "%d-%b-%y", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+
+    return date_str
+
+
+# ============================================================================
+# TDL REQUEST TEMPLATES
+# ============================================================================
+#
+# PART/LINE/FIELD/COLLECTION definitions for the TDL reports, built once at
+# import; each request only substitutes the company name via _tdl_report.
+# Ledger, group and cost-centre defs are also combined by get_masters, which
+# has Tally render all three in one report.
+
+_TDL_COMPANY_DEFS = """
+                    <PART NAME="CmpPart">
+                        <LINES>CmpLine</LINES>
+                        <REPEAT>CmpLine : CmpColl</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE NAME="CmpLine">
+                        <FIELDS>FldCmpName, FldCmpAddr, FldCmpState, FldCmpPin,
+                                FldCmpPhone, FldCmpEmail, FldCmpGSTIN, FldCmpPAN,
+                                FldCmpBooksFrom</FIELDS>
+                    </LINE>
+                    <FIELD NAME="FldCmpName"><SET>$Name</SET></FIELD>
+                    <FIELD NAME="FldCmpAddr"><SET>$Address</SET></FIELD>
+                    <FIELD NAME="FldCmpState"><SET>$State</SET></FIELD>
+                    <FIELD NAME="FldCmpPin"><SET>$Pincode</SET></FIELD>
+                    <FIELD NAME="FldCmpPhone"><SET>$PhoneNumber</SET></FIELD>
+                    <FIELD NAME="FldCmpEmail"><SET>$Email</SET></FIELD>
+                    <FIELD NAME="FldCmpGSTIN"><SET>$GSTIN</SET></FIELD>
+                    <FIELD NAME="FldCmpPAN"><SET>$IncomeTaxNumber</SET></FIELD>
+                    <FIELD NAME="FldCmpBooksFrom"><SET>$BooksFrom</SET></FIELD>
+                    <COLLECTION NAME="CmpColl"><TYPE>Company</TYPE></COLLECTION>"""
+
+_TDL_LEDGER_DEFS = """
+                    <PART NAME="MyPartLedgerTable">
+                        <LINES>MyLineLedgerTable</LINES>
+                        <REPEAT>MyLineLedgerTable : LedgerCollection</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE NAME="MyLineLedgerTable">
+                        <FIELDS>FldName, FldParent, FldOpeningBalance, FldClosingBalance,
+                                FldAddress, FldGSTIN, FldPAN, FldEmail, FldPhone,
+                                FldState, FldPincode, FldCreditPeriod</FIELDS>
+                    </LINE>
+                    <FIELD NAME="FldName"><SET>$Name</SET></FIELD>
+                    <FIELD NAME="FldParent"><SET>$Parent</SET></FIELD>
+                    <FIELD NAME="FldOpeningBalance"><SET>$OpeningBalance</SET></FIELD>
+                    <FIELD NAME="FldClosingBalance"><SET>$ClosingBalance</SET></FIELD>
+                    <FIELD NAME="FldAddress"><SET>$Address</SET></FIELD>
+                    <FIELD NAME="FldGSTIN"><SET>$PartyGSTIN</SET></FIELD>
+                    <FIELD NAME="FldPAN"><SET>$IncomeTaxNumber</SET></FIELD>
+                    <FIELD NAME="FldEmail"><SET>$Email</SET></FIELD>
+                    <FIELD NAME="FldPhone"><SET>$Phone</SET></FIELD>
+                    <FIELD NAME="FldState"><SET>$LedStateName</SET></FIELD>
+                    <FIELD NAME="FldPincode"><SET>$Pincode</SET></FIELD>
+                    <FIELD NAME="FldCreditPeriod"><SET>$CreditPeriod</SET></FIELD>
+                    <COLLECTION NAME="LedgerCollection"><TYPE>Ledger</TYPE></COLLECTION>"""
+
+_TDL_GROUP_DEFS = """
+                    <PART NAME="GroupPart">
+                        <LINES>GroupLine</LINES>
+                        <REPEAT>GroupLine : GroupCollection</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE NAME="GroupLine"><FIELDS>FldGrpName, FldGrpParent, FldGrpPrimary</FIELDS></LINE>
+                    <FIELD NAME="FldGrpName"><SET>$Name</SET></FIELD>
+                    <FIELD NAME="FldGrpParent"><SET>$Parent</SET></FIELD>
+                    <FIELD NAME="FldGrpPrimary"><SET>$IsPrimary</SET></FIELD>
+                    <COLLECTION NAME="GroupCollection"><TYPE>Group</TYPE></COLLECTION>"""
+
+_TDL_CC_DEFS = """
+                    <PART NAME="CCPart">
+                        <LINES>CCLine</LINES>
+                        <REPEAT>CCLine : CCColl</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE NAME="CCLine"><FIELDS>FldCCName, FldCCParent</FIELDS></LINE>
+                    <FIELD NAME="FldCCName"><SET>$Name</SET></FIELD>
+                    <FIELD NAME="FldCCParent"><SET>$Parent</SET></FIELD>
+                    <COLLECTION NAME="CCColl"><TYPE>Cost Centre</TYPE></COLLECTION>"""
+
+
+# Company list is not company-scoped, so the whole request is a constant,
+# pre-encoded and posted as-is
+_COMPANY_LIST_XML = b"""
+        <ENVELOPE>
+            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
+            <TYPE>Data</TYPE><ID>List of Companies</ID></HEADER>
+            <BODY><DESC>
+                <STATICVARIABLES><SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT></STATICVARIABLES>
+                <TDL><TDLMESSAGE>
+                    <REPORT NAME="List of Companies"><FORMS>CompanyForm</FORMS></REPORT>
+                    <FORM NAME="CompanyForm"><PARTS>CompanyPart</PARTS></FORM>
+                    <PART NAME="CompanyPart">
+                        <LINES>CompanyLine</LINES>
+                        <REPEAT>CompanyLine : Company</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE NAME="CompanyLine"><FIELDS>FldCompanyName</FIELDS></LINE>
+                    <FIELD NAME="FldCompanyName"><SET>$Name</SET></FIELD>
+                </TDLMESSAGE></TDL>
+            </DESC></BODY>
+        </ENVELOPE>"""
+
+
+# Voucher Collection export (see TallyDataExtractor approach #3); only the
+# company and date window vary between calls
+_VCH_COLLECTION_XML = """
+        <ENVELOPE>
+            <HEADER>
+                <VERSION>1</VERSION>
+                <TALLYREQUEST>Export</TALLYREQUEST>
+                <TYPE>Collection</TYPE>
+                <ID>VchCollection</ID>
+            </HEADER>
+            <BODY>
+                <DESC>
+                    <STATICVARIABLES>
+                        <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                        <SVCURRENTCOMPANY>{company}</SVCURRENTCOMPANY>
+                        <SVFROMDATE>{fd}</SVFROMDATE>
+                        <SVTODATE>{td}</SVTODATE>
+                    </STATICVARIABLES>
+                    <TDL>
+                        <TDLMESSAGE>
+                            <COLLECTION NAME="VchCollection">
+                                <TYPE>Voucher</TYPE>
+                                <NATIVEMETHOD>VoucherNumber, VoucherTypeName, Date,
+                                              Amount, PartyLedgerName, Narration</NATIVEMETHOD>
+                                <NATIVEMETHOD>AllLedgerEntries</NATIVEMETHOD>
+                            </COLLECTION>
+                        </TDLMESSAGE>
+                    </TDL>
+                </DESC>
+            </BODY>
+        </ENVELOPE>"""
+
+
+def _tdl_report(report: str, form: str, parts: str, defs: str, company: str,
+                export_format: str = "XML") -> str:
+    """Wrap TDL definitions in an Export/Data envelope for `company`."""
+    return f"""
+        <ENVELOPE>
+            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
+            <TYPE>Data</TYPE><ID>{report}</ID></HEADER>
+            <BODY><DESC>
+                <STATICVARIABLES>
+                    <SVEXPORTFORMAT>$$SysName:{export_format}</SVEXPORTFORMAT>
+                    <SVCURRENTCOMPANY>{company}</SVCURRENTCOMPANY>
+                </STATICVARIABLES>
+                <TDL><TDLMESSAGE>
+                    <REPORT NAME="{report}"><FORMS>{form}</FORMS></REPORT>
+                    <FORM NAME="{form}"><PARTS>{parts}</PARTS></FORM>{defs}
+                </TDLMESSAGE></TDL>
+            </DESC></BODY>
+        </ENVELOPE>"""
+
+
+# ============================================================================
+# REPORT FIELDS
+# ============================================================================
+#
+# Tag -> output key(s) for MyReportLedgerTable. One dict lookup per element
+# in _collect_masters instead of walking an if/elif chain. FLDNAME starts a
+# new record and is handled separately.
+
+_LEDGER_TEXT_FIELDS = {
+    "FLDPARENT": "parent_group",
+    "FLDADDRESS": "address",
+    "FLDGSTIN": "gstin",
+    "FLDPAN": "pan",
+    "FLDEMAIL": "email",
+    "FLDPHONE": "phone",
+    "FLDSTATE": "state",
+    "FLDPINCODE": "pincode",
+    "FLDCREDITPERIOD": "credit_period",
+}
+
+_LEDGER_AMOUNT_FIELDS = {
+    "FLDOPENINGBALANCE": ("opening_balance", "opening_dr_cr"),
+    "FLDCLOSINGBALANCE": ("closing_balance", "closing_dr_cr"),
+}
+
+# Column order of MyLineLedgerTable when the report is exported as CSV:
+# FldName, FldParent, the two balances, then these text fields in order
+_LEDGER_CSV_TEXT_KEYS = (
+    "address", "gstin", "pan", "email", "phone", "state", "pincode", "credit_period",
+)
+_LEDGER_CSV_WIDTH = 4 + len(_LEDGER_CSV_TEXT_KEYS)
+# What a CSV opening/closing balance cell may hold: empty, or a Tally amount
+# such as "-2,500.50" or "300.00 Dr"
+_RE_CSV_AMOUNT = re.compile(r'^(?:-?[\d,]*\.?\d+\s*(?:Dr|Cr)?)?$', re.IGNORECASE)
+# How long a "Tally rejected the CSV ledger export" verdict is trusted; a
+# Tally upgrade gets the CSV path retried after this
+_LEDGER_CSV_VERDICT_TTL = 24 * 3600
+
+# <VOUCHER> children read by _parse_voucher_element, besides the ledger
+# entries; anything else in the element is skipped
+_VOUCHER_HEADER_TAGS = frozenset((
+    "VOUCHERNUMBER", "DATE", "NARRATION", "VOUCHERTYPENAME", "PARTYLEDGERNAME", "PARTYNAME",
+))
+
+# Tally's predefined groups that get_financial_summary totals, interned to
+# match the interned parent_group values on cached ledgers
+_ASSET_GROUPS = frozenset(map(sys.intern, (
+    "Bank Accounts", "Cash-in-Hand", "Fixed Assets", "Sundry Debtors",
+    "Deposits (Asset)", "Loans & Advances (Asset)", "Investments",
+)))
+_LIABILITY_GROUPS = frozenset(map(sys.intern, (
+    "Sundry Creditors", "Secured Loans", "Unsecured Loans",
+    "Capital Account", "Reserves & Surplus", "Duties & Taxes",
+    "Current Liabilities", "Provisions",
+)))
+
+# Tag -> key for CompanyInfoReport
+_COMPANY_INFO_FIELDS = {
+    "FLDCMPNAME": "company_name", "FLDCMPADDR": "address",
+    "FLDCMPSTATE": "state", "FLDCMPPIN": "pincode",
+    "FLDCMPPHONE": "phone", "FLDCMPEMAIL": "email",
+    "FLDCMPGSTIN": "gstin", "FLDCMPPAN": "pan",
+    "FLDCMPBOOKSFROM": "books_from",
+}
+
+
+# ============================================================================
+# DISK CACHE
+# ============================================================================
+#
+# Optional sqlite-backed snapshot store for master data, so a restarted
+# process (or another uvicorn worker on the same host) can reuse a recent
+# ledger/group/cost-centre fetch instead of asking Tally again. Entries are
+# JSON and carry the time they were fetched; freshness is judged by the
+# caller's TTL. A fresh connection per call keeps it safe across threads and
+# processes; sqlite serialises the writes.
+
+class _DiskCache:
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "tally_cache.sqlite3")
+        with closing(sqlite3.connect(self.path, timeout=5)) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots "
+                "(key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def get(self, key: str, ttl: float) -> Optional[Tuple[float, object]]:
+        """(fetched_at, value) if `key` was stored less than `ttl` seconds ago."""
+        try:
+            with closing(sqlite3.connect(self.path, timeout=5)) as db:
+                row = db.execute(
+                    "SELECT fetched_at, value FROM snapshots WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Disk cache read failed (%s): %s", key, exc)
+            return None
+        if row is None or (time.time() - row[0]) >= ttl:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, value, fetched_at: Optional[float] = None):
+        try:
+            with closing(sqlite3.connect(self.path, timeout=5)) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                    (key, fetched_at or time.time(), json.dumps(value, default=str)),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Disk cache write failed (%s): %s", key, exc)
+
+    def delete_prefix(self, prefix: str):
+        try:
+            with closing(sqlite3.connect(self.path, timeout=5)) as db, db:
+                db.execute("DELETE FROM snapshots WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as exc:
+            logger.warning("Disk cache delete failed (%s): %s", prefix, exc)
+
+
 # ============================================================================
 # ENUMS
 # ============================================================================
@@ -98,6 +662,8 @@ class TallyDataExtractor:
         financial_year_end: str = "20260331",
         force_odbc: bool = False,
         max_retries: int = 3,
+        cache_dir: Optional[str] = None,
+        ledger_csv: bool = False,
     ):
         self.url = url
         self.company_name = company_name
@@ -107,78 +673,70 @@ class TallyDataExtractor:
         self.force_odbc = force_odbc
         self.max_retries = max_retries
         self._method = ExtractionMethod.ODBC if force_odbc else ExtractionMethod.XML_API
+        self._session = _new_session()
+        self._odbc_conn = None
+        self._odbc_opened = 0.0
+        self._odbc_max_age = 600  # seconds before a reused ODBC connection is recycled
+        self._odbc_lock = threading.Lock()
 
         # Cache
         self._ledger_cache: Optional[List[Dict]] = None
+        self._ledger_by_name: Dict[str, Dict] = {}
+        self._ledger_by_group: Dict[str, List[Dict]] = {}
         self._cache_time: Optional[float] = None
         self._cache_ttl = 300  # 5 minutes
+        self._vch_group_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, List[Dict]]]] = {}
+        self._vch_group_ttl = 60
+        # Guards the memo; each window being exported has its own lock in
+        # _vch_group_pending so concurrent callers wait for one export
+        self._vch_group_lock = threading.Lock()
+        self._vch_group_pending: Dict[Tuple[str, str], threading.Lock] = {}
+        # Masters and company info by name, as (fetched_at, value); ledgers
+        # are also kept, indexed, in _ledger_cache
+        self._snapshots: Dict[str, Tuple[float, object]] = {}
+        # Masters snapshots on disk, shared across restarts/workers (opt-in)
+        self._disk_cache = _DiskCache(cache_dir) if cache_dir else None
+        self._disk_prefix = f"{url}|{company_name}|"
+        # The CSV ledger export is opt-in (ledger_csv). Cleared the first time
+        # Tally answers it with something else; get_all_ledgers then sticks to
+        # XML. The verdict is kept in the disk cache so later processes skip
+        # the failed probe.
+        self._ledger_csv_ok = ledger_csv and not (
+            self._disk_cache
+            and self._disk_cache.get(self._disk_prefix + "ledger_csv_unsupported", _LEDGER_CSV_VERDICT_TTL)
+        )
+        self._last_conn_probe: Optional[Tuple[float, Dict]] = None
+        self._conn_probe_ttl = 5.0
 
         logger.info(
             "TallyDataExtractor init | company=%s | url=%s | FY=%s-%s | force_odbc=%s",
             company_name, url, financial_year_start, financial_year_end, force_odbc,
         )
 
+    def close(self):
+        """Release pooled HTTP and ODBC connections. Safe to call more than once."""
+        self._session.close()
+        with self._odbc_lock:
+            self._drop_odbc_connection()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     # ========================================================================
     # INTERNAL HELPERS
     # ========================================================================
 
     @staticmethod
     def clean_xml(xml_string: str) -> str:
-        """Remove invalid XML character references (control chars)."""
-        return re.sub(r'&#([0-8]|1[0-9]|2[0-9]|3[01]);', '', xml_string)
-
-    @staticmethod
-    def parse_amount(amount_str: str) -> Tuple[float, str]:
-        """
-        Parse Tally amount string to (abs_amount, 'Dr'|'Cr').
-        Tally: Positive = Debit, Negative = Credit
-        """
-        if not amount_str:
-            return 0.0, "Dr"
-
-        cleaned = amount_str.replace(",", "").replace(" ", "").strip()
-
-        if cleaned.upper().endswith("DR"):
-            cleaned = cleaned[:-2].strip()
-            forced_dr = True
-        elif cleaned.upper().endswith("CR"):
-            cleaned = cleaned[:-2].strip()
-            forced_dr = False
-        else:
-            forced_dr = None
-
-        try:
-            val = float(cleaned)
-        except ValueError:
-            return 0.0, "Dr"
-
-        if forced_dr is not None:
-            return abs(val), "Dr" if forced_dr else "Cr"
-
-        if val < 0:
-            return abs(val), "Cr"
-        return val, "Dr"
-
-    @staticmethod
-    def parse_tally_date(date_str: str) -> str:
-        """
-        Parse Tally date to YYYY-MM-DD.
-        Handles: YYYYMMDD, d-MMM-YY, d-MMM-YYYY, DD-MM-YYYY, etc.
-        """
-        if not date_str:
-            return ""
-        date_str = date_str.strip()
+        """Remove XML character references to characters XML 1.0 disallows."""
+        return _RE_BAD_CHARREF.sub('', xml_string)
 
-        if re.match(r'^\d{8}$', date_str):
-            return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-
-        for fmt in ("%d-%b-%Y", "%d-%b-%y", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-
-        return date_str
+    # Module-level and memoised (see VALUE PARSERS); kept here as the public API
+    parse_amount = staticmethod(parse_amount)
+    parse_tally_date = staticmethod(parse_tally_date)
 
     @staticmethod
     def _normalize_date_param(date_str: str) -> str:
@@ -189,7 +747,7 @@ class TallyDataExtractor:
         if not date_str:
             return ""
         date_str = date_str.strip()
-        if re.match(r'^\d{8}$', date_str):
+        if _RE_YYYYMMDD.match(date_str):
             return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
         return date_str
 
@@ -201,24 +759,22 @@ class TallyDataExtractor:
             return child.text.strip()
         return default
 
-    def _execute_request(self, xml_request: str, timeout: int = 30) -> Optional[str]:
-        """Execute XML request to Tally with retry logic."""
-        if self.force_odbc:
-            return None
-
-        headers = {"Content-Type": "application/xml"}
-
+    def _post(self, xml_request: Union[str, bytes], timeout: int,
+              stream: bool = False) -> Optional[requests.Response]:
+        """POST an XML request to Tally with retry logic. Returns the HTTP 200 response or None."""
+        # Encode once for all attempts. A str body would be sent as Latin-1 by
+        # http.client and fail on company names outside that range.
+        body = xml_request if isinstance(xml_request, bytes) else xml_request.encode("utf-8")
         for attempt in range(1, self.max_retries + 1):
             try:
-                resp = requests.post(
-                    self.url, data=xml_request, headers=headers, timeout=timeout
-                )
+                resp = self._session.post(self.url, data=body, timeout=timeout, stream=stream)
                 if resp.status_code == 200:
                     self._method = ExtractionMethod.XML_API
-                    logger.debug("XML API OK (%d bytes) attempt=%d", len(resp.text), attempt)
-                    return self.clean_xml(resp.text)
+                    logger.debug("XML API OK attempt=%d", attempt)
+                    return resp
                 else:
                     logger.warning("Tally HTTP %d (attempt %d/%d)", resp.status_code, attempt, self.max_retries)
+                    resp.close()
             except requests.exceptions.ConnectionError:
                 logger.warning("Connection failed to %s (attempt %d/%d)", self.url, attempt, self.max_retries)
             except requests.exceptions.Timeout:
@@ -227,16 +783,55 @@ class TallyDataExtractor:
                 logger.exception("Unexpected error (attempt %d/%d): %s", attempt, self.max_retries, exc)
 
             if attempt < self.max_retries:
-                time.sleep(attempt * 2)
+                # Jitter so concurrent callers that failed together don't all
+                # retry against Tally at the same instant
+                time.sleep(attempt * 2 + random.uniform(0, 0.5))
 
         logger.error("All %d XML API attempts failed", self.max_retries)
         return None
 
+    def _execute_request(self, xml_request: Union[str, bytes], timeout: int = 30) -> Optional[str]:
+        """Execute XML request to Tally with retry logic."""
+        if self.force_odbc:
+            return None
+        resp = self._post(xml_request, timeout)
+        if resp is None:
+            return None
+        logger.debug("XML API response: %d bytes", len(resp.content))
+        return self.clean_xml(resp.text)
+
+    def _execute_request_stream(self, xml_request: Union[str, bytes],
+                                timeout: int = 30) -> Optional[requests.Response]:
+        """
+        Like _execute_request, but the body is left unread: returns the streamed
+        response so a caller can consume resp.raw incrementally instead of
+        buffering a multi-MB payload. The caller must close() it. No clean_xml
+        pass is applied; wrap it in _CleanXMLStream to get one.
+        """
+        if self.force_odbc:
+            return None
+        resp = self._post(xml_request, timeout, stream=True)
+        if resp is not None:
+            resp.raw.decode_content = True
+        return resp
+
     # ========================================================================
     # ODBC FALLBACK
     # ========================================================================
 
     def _get_odbc_connection(self):
+        """
+        Return the shared ODBC connection, opening one if there is none or the
+        current one has outlived _odbc_max_age (long-lived Tally ODBC
+        connections are known to leak memory in the driver). Call with
+        _odbc_lock held.
+        """
+        conn = self._odbc_conn
+        if conn is not None and (time.monotonic() - self._odbc_opened) < self._odbc_max_age:
+            self._method = ExtractionMethod.ODBC
+            return conn
+        self._drop_odbc_connection()
+
         try:
             import pyodbc
         except ImportError:
@@ -247,29 +842,50 @@ class TallyDataExtractor:
             logger.info("ODBC connecting: DSN=%s, Company=%s", self.odbc_dsn, self.company_name)
             conn = pyodbc.connect(conn_str, timeout=30)
             self._method = ExtractionMethod.ODBC
+            self._odbc_conn, self._odbc_opened = conn, time.monotonic()
             return conn
         except Exception as exc:
             logger.error("ODBC connection failed: %s", exc)
             return None
 
-    def _odbc_query(self, sql: str) -> Optional[List[Dict]]:
-        conn = self._get_odbc_connection()
-        if not conn:
-            return None
-        try:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            columns = [col[0] for col in cursor.description]
-            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            conn.close()
-            return rows
-        except Exception as exc:
-            logger.error("ODBC query failed: %s | SQL: %s", exc, sql[:200])
+    def _drop_odbc_connection(self):
+        conn, self._odbc_conn = self._odbc_conn, None
+        if conn is not None:
             try:
                 conn.close()
             except Exception:
                 pass
-            return None
+
+    def _odbc_query(self, sql: str) -> Optional[List[tuple]]:
+        """
+        Run `sql` and return the raw rows (tuple-like, in SELECT column order)
+        or None on failure. Callers unpack them positionally rather than paying
+        for a dict per row.
+        """
+        # pyodbc connections aren't safe to share between threads, so queries
+        # on the reused connection are serialised. A query that fails on a
+        # reused connection is retried once on a fresh one, in case Tally
+        # dropped it while idle.
+        with self._odbc_lock:
+            for attempt in (1, 2):
+                reused = self._odbc_conn is not None
+                conn = self._get_odbc_connection()
+                if not conn:
+                    return None
+                try:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute(sql)
+                        return cursor.fetchall()
+                    finally:
+                        cursor.close()
+                except Exception as exc:
+                    self._drop_odbc_connection()
+                    if attempt == 1 and reused:
+                        logger.warning("ODBC query failed on reused connection, reconnecting: %s", exc)
+                        continue
+                    logger.error("ODBC query failed: %s | SQL: %s", exc, sql[:200])
+                    return None
 
     def _odbc_get_ledgers(self) -> Optional[List[Dict]]:
         sql = ("SELECT $Name, $Parent, $OpeningBalance, $ClosingBalance, "
@@ -279,8 +895,8 @@ class TallyDataExtractor:
         if not rows:
             return None
         ledgers = []
-        for row in rows:
-            o_raw, c_raw = row.get("$OpeningBalance", 0), row.get("$ClosingBalance", 0)
+        for (name, parent, o_raw, c_raw,
+             address, gstin, pan, email, phone, state, pincode) in rows:
             if isinstance(o_raw, (int, float)):
                 o_amt, o_dc = abs(o_raw), "Cr" if o_raw < 0 else "Dr"
             else:
@@ -292,14 +908,12 @@ class TallyDataExtractor:
             o_sign = o_amt if o_dc == "Dr" else -o_amt
             c_sign = c_amt if c_dc == "Dr" else -c_amt
             ledgers.append({
-                "ledger_name": row.get("$Name", ""), "company": self.company_name,
-                "parent_group": row.get("$Parent", ""),
+                "ledger_name": name, "company": self.company_name,
+                "parent_group": parent,
                 "opening_balance": o_amt, "opening_dr_cr": o_dc,
                 "closing_balance": c_amt, "closing_dr_cr": c_dc,
-                "address": row.get("$Address", ""), "gstin": row.get("$PartyGSTIN", ""),
-                "pan": row.get("$IncomeTaxNumber", ""), "email": row.get("$Email", ""),
-                "phone": row.get("$Phone", ""), "state": row.get("$LedStateName", ""),
-                "pincode": row.get("$Pincode", ""),
+                "address": address, "gstin": gstin, "pan": pan, "email": email,
+                "phone": phone, "state": state, "pincode": pincode,
                 "net_movement": round(c_sign - o_sign, 2),
             })
         return ledgers
@@ -307,14 +921,22 @@ class TallyDataExtractor:
     def _odbc_get_company_list(self) -> Optional[List[str]]:
         rows = self._odbc_query("SELECT $Name FROM Company")
         if rows:
-            return [r.get("$Name", "") for r in rows if r.get("$Name")]
+            return [r[0] for r in rows if r[0]]
         return None
 
     # ========================================================================
     # CONNECTION TEST
     # ========================================================================
 
-    def test_connection(self) -> Dict:
+    def test_connection(self, force: bool = False) -> Dict:
+        """
+        Probe XML API and ODBC. The result is reused for 5 seconds so frequent
+        health checks don't hit Tally on every call; pass force=True to re-probe.
+        """
+        probe = self._last_conn_probe
+        if not force and probe and (time.monotonic() - probe[0]) < self._conn_probe_ttl:
+            return probe[1]
+
         result = {
             "xml_api": {"connected": False, "companies": [], "error": None},
             "odbc": {"connected": False, "companies": [], "error": None},
@@ -353,6 +975,7 @@ class TallyDataExtractor:
 
         # If force_odbc but ODBC failed, active_method is still None here.
         # The switch-company endpoint handles the fallback from there.
+        self._last_conn_probe = (time.monotonic(), result)
         return result
 
     def is_connected(self) -> bool:
@@ -369,31 +992,12 @@ class TallyDataExtractor:
     # ========================================================================
 
     def _xml_get_company_list(self) -> List[str]:
-        xml_request = """
-        <ENVELOPE>
-            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
-            <TYPE>Data</TYPE><ID>List of Companies</ID></HEADER>
-            <BODY><DESC>
-                <STATICVARIABLES><SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT></STATICVARIABLES>
-                <TDL><TDLMESSAGE>
-                    <REPORT NAME="List of Companies"><FORMS>CompanyForm</FORMS></REPORT>
-                    <FORM NAME="CompanyForm"><PARTS>CompanyPart</PARTS></FORM>
-                    <PART NAME="CompanyPart">
-                        <LINES>CompanyLine</LINES>
-                        <REPEAT>CompanyLine : Company</REPEAT>
-                        <SCROLLED>Vertical</SCROLLED>
-                    </PART>
-                    <LINE NAME="CompanyLine"><FIELDS>FldCompanyName</FIELDS></LINE>
-                    <FIELD NAME="FldCompanyName"><SET>$Name</SET></FIELD>
-                </TDLMESSAGE></TDL>
-            </DESC></BODY>
-        </ENVELOPE>"""
-        xml_resp = self._execute_request(xml_request)
+        xml_resp = self._execute_request(_COMPANY_LIST_XML)
         if not xml_resp:
             return []
         try:
-            root = ET.fromstring(xml_resp)
-            return [e.text.strip() for e in root.iter() if e.tag == "FLDCOMPANYNAME" and e.text]
+            root = _fromstring(xml_resp)
+            return [e.text.strip() for e in root.iter("FLDCOMPANYNAME") if e.text]
         except ET.ParseError as exc:
             logger.error("XML parse error (company list): %s", exc)
             return []
@@ -424,41 +1028,12 @@ class TallyDataExtractor:
         FIX: Added <COLLECTION NAME="CmpColl"><TYPE>Company</TYPE></COLLECTION>
         Without this, the REPEAT had nothing to iterate over → empty fields.
         """
-        xml_request = f"""
-        <ENVELOPE>
-            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
-            <TYPE>Data</TYPE><ID>CompanyInfoReport</ID></HEADER>
-            <BODY><DESC>
-                <STATICVARIABLES>
-                    <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                    <SVCURRENTCOMPANY>{self.company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-                <TDL><TDLMESSAGE>
-                    <REPORT NAME="CompanyInfoReport"><FORMS>CmpForm</FORMS></REPORT>
-                    <FORM NAME="CmpForm"><PARTS>CmpPart</PARTS></FORM>
-                    <PART NAME="CmpPart">
-                        <LINES>CmpLine</LINES>
-                        <REPEAT>CmpLine : CmpColl</REPEAT>
-                        <SCROLLED>Vertical</SCROLLED>
-                    </PART>
-                    <LINE NAME="CmpLine">
-                        <FIELDS>FldCmpName, FldCmpAddr, FldCmpState, FldCmpPin,
-                                FldCmpPhone, FldCmpEmail, FldCmpGSTIN, FldCmpPAN,
-                                FldCmpBooksFrom</FIELDS>
-                    </LINE>
-                    <FIELD NAME="FldCmpName"><SET>$Name</SET></FIELD>
-                    <FIELD NAME="FldCmpAddr"><SET>$Address</SET></FIELD>
-                    <FIELD NAME="FldCmpState"><SET>$State</SET></FIELD>
-                    <FIELD NAME="FldCmpPin"><SET>$Pincode</SET></FIELD>
-                    <FIELD NAME="FldCmpPhone"><SET>$PhoneNumber</SET></FIELD>
-                    <FIELD NAME="FldCmpEmail"><SET>$Email</SET></FIELD>
-                    <FIELD NAME="FldCmpGSTIN"><SET>$GSTIN</SET></FIELD>
-                    <FIELD NAME="FldCmpPAN"><SET>$IncomeTaxNumber</SET></FIELD>
-                    <FIELD NAME="FldCmpBooksFrom"><SET>$BooksFrom</SET></FIELD>
-                    <COLLECTION NAME="CmpColl"><TYPE>Company</TYPE></COLLECTION>
-                </TDLMESSAGE></TDL>
-            </DESC></BODY>
-        </ENVELOPE>"""
+        hit = self._snapshot_load("company_info")
+        if hit:
+            return hit[1]
+        xml_request = _tdl_report(
+            "CompanyInfoReport", "CmpForm", "CmpPart", _TDL_COMPANY_DEFS, self.company_name,
+        )
 
         xml_resp = self._execute_request(xml_request)
         info = {
@@ -470,20 +1045,13 @@ class TallyDataExtractor:
                 "Cannot connect to Tally. Please ensure Tally Prime is running."
             )
         try:
-            root = ET.fromstring(xml_resp)
-            tag_map = {
-                "FLDCMPNAME": "company_name", "FLDCMPADDR": "address",
-                "FLDCMPSTATE": "state", "FLDCMPPIN": "pincode",
-                "FLDCMPPHONE": "phone", "FLDCMPEMAIL": "email",
-                "FLDCMPGSTIN": "gstin", "FLDCMPPAN": "pan",
-                "FLDCMPBOOKSFROM": "books_from",
-            }
-            for elem in root.iter():
-                key = tag_map.get(elem.tag)
-                if key and elem.text:
-                    info[key] = elem.text.strip()
+            root = _fromstring(xml_resp)
+            for elem in _iter_tags(root, _COMPANY_INFO_FIELDS):
+                if elem.text:
+                    info[_COMPANY_INFO_FIELDS[elem.tag]] = elem.text.strip()
             if not info["company_name"]:
                 info["company_name"] = self.company_name
+            self._snapshot_save("company_info", info)
             return info
         except ET.ParseError as exc:
             logger.error("XML parse error (company info): %s", exc)
@@ -494,16 +1062,56 @@ class TallyDataExtractor:
     # LEDGER FUNCTIONS (TDL approach - works perfectly for ledgers)
     # ========================================================================
 
-    def _invalidate_cache(self):
+    def invalidate_cache(self):
+        """Drop every cached master and voucher group, in memory and on disk."""
         self._ledger_cache = None
         self._cache_time = None
+        self._ledger_by_name = {}
+        self._ledger_by_group = {}
+        self._vch_group_cache.clear()
+        self._snapshots.clear()
+        if self._disk_cache:
+            self._disk_cache.delete_prefix(self._disk_prefix)
+
+    def _snapshot_load(self, name: str) -> Optional[Tuple[float, object]]:
+        """
+        (fetched_at, value) for a cached master younger than _cache_ttl, from
+        memory or else the disk cache; None if there is none.
+        """
+        hit = self._snapshots.get(name)
+        if hit is not None and time.time() - hit[0] < self._cache_ttl:
+            return hit
+        if self._disk_cache is None:
+            return None
+        hit = self._disk_cache.get(self._disk_prefix + name, self._cache_ttl)
+        if hit:
+            self._snapshots[name] = hit
+        return hit
+
+    def _snapshot_save(self, name: str, value):
+        if not value:
+            return
+        self._snapshots[name] = (time.time(), value)
+        if self._disk_cache is not None:
+            self._disk_cache.set(self._disk_prefix + name, value)
 
     def get_all_ledgers(self, force_refresh: bool = False) -> List[Dict]:
         if (not force_refresh and self._ledger_cache is not None
                 and self._cache_time and (time.time() - self._cache_time) < self._cache_ttl):
             return self._ledger_cache
 
-        ledgers = self._xml_get_ledgers()
+        if not force_refresh:
+            hit = self._snapshot_load("ledgers")
+            if hit:
+                fetched_at, ledgers = hit
+                self._store_ledgers(ledgers, fetched_at)
+                logger.info("Loaded %d ledgers from disk cache", len(ledgers))
+                return ledgers
+
+        if self._ledger_csv_ok:
+            ledgers = self._csv_get_ledgers()
+        else:
+            ledgers = self._xml_get_ledgers()
         if ledgers is None:
             logger.info("XML API failed for ledgers, trying ODBC...")
             ledgers = self._odbc_get_ledgers()
@@ -513,108 +1121,196 @@ class TallyDataExtractor:
                 "Cannot connect to Tally. XML API and ODBC both unavailable."
             )
 
-        self._ledger_cache = ledgers
-        self._cache_time = time.time()
-        logger.info("Fetched %d ledgers via %s", len(ledgers), self._method.value)
+        self._store_ledgers(ledgers)
+        self._snapshot_save("ledgers", ledgers)
+        logger.info("Fetched %d ledgers via %s", len(ledgers), self._method.value)
+        return ledgers
+
+    def _store_ledgers(self, ledgers: List[Dict], fetched_at: Optional[float] = None):
+        """Fill the ledger cache and its lookup indexes."""
+        # Keyed case-insensitively; the first ledger wins on duplicate names,
+        # matching the old linear scan.
+        by_name: Dict[str, Dict] = {}
+        by_group: Dict[str, List[Dict]] = {}
+        for led in ledgers:
+            # Thousands of ledgers share a few dozen group names; interned,
+            # the group lookups and comparisons in the analytics below hit
+            # the identity fast path. Done here so every source (XML, CSV,
+            # ODBC, disk cache) gets it.
+            grp = led.get("parent_group")
+            if isinstance(grp, str):
+                led["parent_group"] = sys.intern(grp)
+            # ODBC rows can carry NULL ($Name/$Parent) as None
+            by_name.setdefault((led.get("ledger_name") or "").lower(), led)
+            by_group.setdefault((led.get("parent_group") or "").lower(), []).append(led)
+        self._ledger_by_name = by_name
+        self._ledger_by_group = by_group
+
+        self._ledger_cache = ledgers
+        self._cache_time = fetched_at or time.time()
+
+    def _csv_get_ledgers(self) -> Optional[List[Dict]]:
+        """
+        Fetch the ledger report as CSV, one row per ledger. Ledgers are plain
+        tabular data, and the CSV body is a fraction of the size of the XML
+        one and goes through the C csv reader instead of an element walk.
+
+        Falls back to _xml_get_ledgers if the body isn't rows of the expected
+        width with amounts in the balance columns; one leading header row is
+        skipped. Returns None only if Tally could not be reached.
+
+        $$SysName:CSV is TDL's name for the CSV export format; this path has
+        only been exercised against a Tally stand-in, not a real TallyPrime
+        release, so it is off unless the extractor is built with
+        ledger_csv=True.
+        """
+        if self.force_odbc:
+            return None
+        csv_request = _tdl_report(
+            "MyReportLedgerTable", "MyFormLedgerTable", "MyPartLedgerTable",
+            _TDL_LEDGER_DEFS, self.company_name, export_format="CSV",
+        )
+        resp = self._post(csv_request, 30)
+        if resp is None:
+            return None
+
+        ledgers = []
+        company = self.company_name
+        parse_amount = self.parse_amount
+        header_seen = False
+        for row in csv.reader(io.StringIO(resp.text)):
+            if not row:
+                continue
+            if len(row) != _LEDGER_CSV_WIDTH:
+                logger.warning(
+                    "CSV ledger export not understood (%d columns), using XML", len(row),
+                )
+                self._disable_ledger_csv()
+                return self._xml_get_ledgers()
+            name, parent, opening, closing, *rest = [v.strip() for v in row]
+            if not (_RE_CSV_AMOUNT.match(opening) and _RE_CSV_AMOUNT.match(closing)):
+                # Text in the balance columns: a header line ahead of the
+                # data, or else a column layout this code doesn't know
+                if not ledgers and not header_seen:
+                    header_seen = True
+                    continue
+                logger.warning(
+                    "CSV ledger export not understood (balance %r / %r), using XML", opening, closing,
+                )
+                self._disable_ledger_csv()
+                return self._xml_get_ledgers()
+            o_amt, o_dc = parse_amount(opening)
+            c_amt, c_dc = parse_amount(closing)
+            led = {
+                "ledger_name": name,
+                "company": company,
+                "parent_group": parent,
+                "opening_balance": o_amt,
+                "opening_dr_cr": o_dc,
+                "closing_balance": c_amt,
+                "closing_dr_cr": c_dc,
+            }
+            led.update(zip(_LEDGER_CSV_TEXT_KEYS, rest))
+            led["net_movement"] = round(
+                (c_amt if c_dc == "Dr" else -c_amt) - (o_amt if o_dc == "Dr" else -o_amt), 2
+            )
+            ledgers.append(led)
+
+        if not ledgers:
+            # An empty body is more likely an unsupported format than a
+            # company without a single ledger; let the XML path decide
+            self._disable_ledger_csv()
+            return self._xml_get_ledgers()
         return ledgers
 
+    def _disable_ledger_csv(self):
+        """Use the XML ledger export from now on, in this process and (via the disk cache) others."""
+        self._ledger_csv_ok = False
+        if self._disk_cache is not None:
+            self._disk_cache.set(self._disk_prefix + "ledger_csv_unsupported", True)
+
     def _xml_get_ledgers(self) -> Optional[List[Dict]]:
-        xml_request = f"""
-        <ENVELOPE>
-            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
-            <TYPE>Data</TYPE><ID>MyReportLedgerTable</ID></HEADER>
-            <BODY><DESC>
-                <STATICVARIABLES>
-                    <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                    <SVCURRENTCOMPANY>{self.company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-                <TDL><TDLMESSAGE>
-                    <REPORT NAME="MyReportLedgerTable"><FORMS>MyFormLedgerTable</FORMS></REPORT>
-                    <FORM NAME="MyFormLedgerTable"><PARTS>MyPartLedgerTable</PARTS></FORM>
-                    <PART NAME="MyPartLedgerTable">
-                        <LINES>MyLineLedgerTable</LINES>
-                        <REPEAT>MyLineLedgerTable : LedgerCollection</REPEAT>
-                        <SCROLLED>Vertical</SCROLLED>
-                    </PART>
-                    <LINE NAME="MyLineLedgerTable">
-                        <FIELDS>FldName, FldParent, FldOpeningBalance, FldClosingBalance,
-                                FldAddress, FldGSTIN, FldPAN, FldEmail, FldPhone,
-                                FldState, FldPincode, FldCreditPeriod</FIELDS>
-                    </LINE>
-                    <FIELD NAME="FldName"><SET>$Name</SET></FIELD>
-                    <FIELD NAME="FldParent"><SET>$Parent</SET></FIELD>
-                    <FIELD NAME="FldOpeningBalance"><SET>$OpeningBalance</SET></FIELD>
-                    <FIELD NAME="FldClosingBalance"><SET>$ClosingBalance</SET></FIELD>
-                    <FIELD NAME="FldAddress"><SET>$Address</SET></FIELD>
-                    <FIELD NAME="FldGSTIN"><SET>$PartyGSTIN</SET></FIELD>
-                    <FIELD NAME="FldPAN"><SET>$IncomeTaxNumber</SET></FIELD>
-                    <FIELD NAME="FldEmail"><SET>$Email</SET></FIELD>
-                    <FIELD NAME="FldPhone"><SET>$Phone</SET></FIELD>
-                    <FIELD NAME="FldState"><SET>$LedStateName</SET></FIELD>
-                    <FIELD NAME="FldPincode"><SET>$Pincode</SET></FIELD>
-                    <FIELD NAME="FldCreditPeriod"><SET>$CreditPeriod</SET></FIELD>
-                    <COLLECTION NAME="LedgerCollection"><TYPE>Ledger</TYPE></COLLECTION>
-                </TDLMESSAGE></TDL>
-            </DESC></BODY>
-        </ENVELOPE>"""
+        xml_request = _tdl_report(
+            "MyReportLedgerTable", "MyFormLedgerTable", "MyPartLedgerTable",
+            _TDL_LEDGER_DEFS, self.company_name,
+        )
 
-        xml_resp = self._execute_request(xml_request)
-        if not xml_resp:
+        # Streamed: ledgers are parsed as the body arrives and never held whole
+        resp = self._execute_request_stream(xml_request)
+        if resp is None:
             return None
+
         try:
-            root = ET.fromstring(xml_resp)
+            ledgers, _, _ = self._collect_masters(_iter_xml(_CleanXMLStream(resp)))
         except ET.ParseError as exc:
             logger.error("XML parse error (ledgers): %s", exc)
             return None
+        except requests.exceptions.RequestException as exc:
+            logger.error("Ledger stream interrupted: %s", exc)
+            return None
+        finally:
+            resp.close()
+        return ledgers
 
+    def _collect_masters(self, elems) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """
+        Build ledgers, groups and cost centres from a flat run of report field
+        elements. The three reports use disjoint tag names, so one pass handles
+        any of them alone or the bundled get_masters report.
+        """
+        # Signed (Dr positive) balances of the current ledger, so net_movement
+        # is computed as each record closes rather than in a second pass.
         ledgers, current = [], {}
-        for elem in root:
+        o_sign = c_sign = 0
+        groups, grp = [], {}
+        centres, cc = [], {}
+        for elem in elems:
             tag = elem.tag
-            value = elem.text.strip() if elem.text else ""
+            value = (elem.text or "").strip()
             if tag == "FLDNAME":
                 if current and "ledger_name" in current:
+                    current["net_movement"] = round(c_sign - o_sign, 2)
                     ledgers.append(current)
                 current = {"ledger_name": value, "company": self.company_name}
-            elif tag == "FLDPARENT":
-                current["parent_group"] = value
-            elif tag == "FLDOPENINGBALANCE":
-                amt, dc = self.parse_amount(value)
-                current["opening_balance"] = amt
-                current["opening_dr_cr"] = dc
-            elif tag == "FLDCLOSINGBALANCE":
+                o_sign = c_sign = 0
+                continue
+            key = _LEDGER_TEXT_FIELDS.get(tag)
+            if key is not None:
+                current[key] = value
+                continue
+            keys = _LEDGER_AMOUNT_FIELDS.get(tag)
+            if keys is not None:
                 amt, dc = self.parse_amount(value)
-                current["closing_balance"] = amt
-                current["closing_dr_cr"] = dc
-            elif tag == "FLDADDRESS": current["address"] = value
-            elif tag == "FLDGSTIN": current["gstin"] = value
-            elif tag == "FLDPAN": current["pan"] = value
-            elif tag == "FLDEMAIL": current["email"] = value
-            elif tag == "FLDPHONE": current["phone"] = value
-            elif tag == "FLDSTATE": current["state"] = value
-            elif tag == "FLDPINCODE": current["pincode"] = value
-            elif tag == "FLDCREDITPERIOD": current["credit_period"] = value
+                current[keys[0]] = amt
+                current[keys[1]] = dc
+                if tag == "FLDOPENINGBALANCE":
+                    o_sign = amt if dc == "Dr" else -amt
+                else:
+                    c_sign = amt if dc == "Dr" else -amt
+            elif tag == "FLDGRPNAME":
+                if grp: groups.append(grp)
+                grp = {"group_name": value}
+            elif tag == "FLDGRPPARENT": grp["parent"] = value
+            elif tag == "FLDGRPPRIMARY": grp["is_primary"] = value.lower() in ("yes", "true", "1")
+            elif tag == "FLDCCNAME":
+                if cc: centres.append(cc)
+                cc = {"cost_centre": value}
+            elif tag == "FLDCCPARENT": cc["parent"] = value
 
         if current and "ledger_name" in current:
+            current["net_movement"] = round(c_sign - o_sign, 2)
             ledgers.append(current)
-
-        for led in ledgers:
-            o = led.get("opening_balance", 0)
-            c = led.get("closing_balance", 0)
-            o_sign = o if led.get("opening_dr_cr") == "Dr" else -o
-            c_sign = c if led.get("closing_dr_cr") == "Dr" else -c
-            led["net_movement"] = round(c_sign - o_sign, 2)
-
-        return ledgers
+        if grp: groups.append(grp)
+        if cc: centres.append(cc)
+        return ledgers, groups, centres
 
     def get_ledger_by_name(self, ledger_name: str) -> Optional[Dict]:
-        for led in self.get_all_ledgers():
-            if led.get("ledger_name", "").lower() == ledger_name.lower():
-                return led
-        return None
+        self.get_all_ledgers()  # refreshes the cache and its indexes if stale
+        return self._ledger_by_name.get(ledger_name.lower())
 
     def get_ledgers_by_group(self, group_name: str) -> List[Dict]:
-        return [l for l in self.get_all_ledgers()
-                if l.get("parent_group", "").lower() == group_name.lower()]
+        self.get_all_ledgers()
+        return list(self._ledger_by_group.get(group_name.lower(), ()))
 
     def get_bank_accounts(self): return self.get_ledgers_by_group("Bank Accounts")
     def get_cash_accounts(self): return self.get_ledgers_by_group("Cash-in-Hand")
@@ -629,45 +1325,18 @@ class TallyDataExtractor:
     # ========================================================================
 
     def get_all_groups(self) -> List[Dict]:
-        xml_request = f"""
-        <ENVELOPE>
-            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
-            <TYPE>Data</TYPE><ID>GroupReport</ID></HEADER>
-            <BODY><DESC>
-                <STATICVARIABLES>
-                    <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                    <SVCURRENTCOMPANY>{self.company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-                <TDL><TDLMESSAGE>
-                    <REPORT NAME="GroupReport"><FORMS>GroupForm</FORMS></REPORT>
-                    <FORM NAME="GroupForm"><PARTS>GroupPart</PARTS></FORM>
-                    <PART NAME="GroupPart">
-                        <LINES>GroupLine</LINES>
-                        <REPEAT>GroupLine : GroupCollection</REPEAT>
-                        <SCROLLED>Vertical</SCROLLED>
-                    </PART>
-                    <LINE NAME="GroupLine"><FIELDS>FldGrpName, FldGrpParent, FldGrpPrimary</FIELDS></LINE>
-                    <FIELD NAME="FldGrpName"><SET>$Name</SET></FIELD>
-                    <FIELD NAME="FldGrpParent"><SET>$Parent</SET></FIELD>
-                    <FIELD NAME="FldGrpPrimary"><SET>$IsPrimary</SET></FIELD>
-                    <COLLECTION NAME="GroupCollection"><TYPE>Group</TYPE></COLLECTION>
-                </TDLMESSAGE></TDL>
-            </DESC></BODY>
-        </ENVELOPE>"""
+        hit = self._snapshot_load("groups")
+        if hit:
+            return hit[1]
+        xml_request = _tdl_report(
+            "GroupReport", "GroupForm", "GroupPart", _TDL_GROUP_DEFS, self.company_name,
+        )
         xml_resp = self._execute_request(xml_request)
         if not xml_resp:
             raise TallyConnectionError("Cannot connect to Tally.")
         try:
-            root = ET.fromstring(xml_resp)
-            groups, cur = [], {}
-            for elem in root:
-                tag, val = elem.tag, (elem.text or "").strip()
-                if tag == "FLDGRPNAME":
-                    if cur: groups.append(cur)
-                    cur = {"group_name": val}
-                elif tag == "FLDGRPPARENT": cur["parent"] = val
-                elif tag == "FLDGRPPRIMARY": cur["is_primary"] = val.lower() in ("yes", "true", "1")
-            if cur: groups.append(cur)
+            _, groups, _ = self._collect_masters(_fromstring(xml_resp))
+            self._snapshot_save("groups", groups)
             return groups
         except ET.ParseError:
             return []
@@ -677,47 +1346,78 @@ class TallyDataExtractor:
     # ========================================================================
 
     def get_cost_centres(self) -> List[Dict]:
-        xml_request = f"""
-        <ENVELOPE>
-            <HEADER><VERSION>1</VERSION><TALLYREQUEST>Export</TALLYREQUEST>
-            <TYPE>Data</TYPE><ID>CostCentreReport</ID></HEADER>
-            <BODY><DESC>
-                <STATICVARIABLES>
-                    <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                    <SVCURRENTCOMPANY>{self.company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-                <TDL><TDLMESSAGE>
-                    <REPORT NAME="CostCentreReport"><FORMS>CCForm</FORMS></REPORT>
-                    <FORM NAME="CCForm"><PARTS>CCPart</PARTS></FORM>
-                    <PART NAME="CCPart">
-                        <LINES>CCLine</LINES>
-                        <REPEAT>CCLine : CCColl</REPEAT>
-                        <SCROLLED>Vertical</SCROLLED>
-                    </PART>
-                    <LINE NAME="CCLine"><FIELDS>FldCCName, FldCCParent</FIELDS></LINE>
-                    <FIELD NAME="FldCCName"><SET>$Name</SET></FIELD>
-                    <FIELD NAME="FldCCParent"><SET>$Parent</SET></FIELD>
-                    <COLLECTION NAME="CCColl"><TYPE>Cost Centre</TYPE></COLLECTION>
-                </TDLMESSAGE></TDL>
-            </DESC></BODY>
-        </ENVELOPE>"""
+        hit = self._snapshot_load("cost_centres")
+        if hit:
+            return hit[1]
+        xml_request = _tdl_report(
+            "CostCentreReport", "CCForm", "CCPart", _TDL_CC_DEFS, self.company_name,
+        )
         xml_resp = self._execute_request(xml_request)
         if not xml_resp:
             raise TallyConnectionError("Cannot connect to Tally.")
         try:
-            root = ET.fromstring(xml_resp)
-            centres, cur = [], {}
-            for elem in root:
-                tag, val = elem.tag, (elem.text or "").strip()
-                if tag == "FLDCCNAME":
-                    if cur: centres.append(cur)
-                    cur = {"cost_centre": val}
-                elif tag == "FLDCCPARENT": cur["parent"] = val
-            if cur: centres.append(cur)
+            _, _, centres = self._collect_masters(_fromstring(xml_resp))
+            self._snapshot_save("cost_centres", centres)
             return centres
         except ET.ParseError:
             return []
 
+    # ========================================================================
+    # ALL MASTERS IN ONE REPORT
+    # ========================================================================
+
+    def get_masters(self) -> Dict[str, List[Dict]]:
+        """
+        Ledgers, groups and cost centres from a single bundled TDL report:
+        one round trip and one report compile in Tally instead of three.
+        Refreshes the ledger cache. Falls back to the individual requests
+        (and so to ODBC for ledgers) if the bundled report fails or is empty,
+        and per list for groups / cost centres if only those came back empty.
+        """
+        xml_request = _tdl_report(
+            "MastersReport", "MastersForm", "MyPartLedgerTable, GroupPart, CCPart",
+            _TDL_LEDGER_DEFS + _TDL_GROUP_DEFS + _TDL_CC_DEFS, self.company_name,
+        )
+        masters = None
+        resp = self._execute_request_stream(xml_request, timeout=60)
+        if resp is not None:
+            try:
+                masters = self._collect_masters(_iter_xml(_CleanXMLStream(resp)))
+            except (ET.ParseError, requests.exceptions.RequestException) as exc:
+                logger.error("Bundled masters report failed: %s", exc)
+            finally:
+                resp.close()
+
+        # Every company has at least the predefined Cash / P&L ledgers, so an
+        # empty ledger list means Tally didn't render the bundled report.
+        if masters is None or not masters[0]:
+            return {
+                "ledgers": self.get_all_ledgers(force_refresh=True),
+                "groups": self.get_all_groups(),
+                "cost_centres": self.get_cost_centres(),
+            }
+
+        ledgers, groups, centres = masters
+        self._store_ledgers(ledgers)
+        self._snapshot_save("ledgers", ledgers)
+        # Tally may render only the first PART of the bundle; an empty list
+        # is then refetched on its own rather than reported as empty
+        if groups:
+            self._snapshot_save("groups", groups)
+        else:
+            logger.warning("Bundled masters report had no groups, fetching them separately")
+            groups = self.get_all_groups()
+        if centres:
+            self._snapshot_save("cost_centres", centres)
+        else:
+            logger.info("Bundled masters report had no cost centres, fetching them separately")
+            centres = self.get_cost_centres()
+        logger.info(
+            "Fetched %d ledgers, %d groups, %d cost centres in one report",
+            len(ledgers), len(groups), len(centres),
+        )
+        return {"ledgers": ledgers, "groups": groups, "cost_centres": centres}
+
     # ========================================================================
     # VOUCHER FUNCTIONS - Uses Collection Export (TYPE=Collection)
     # ========================================================================
@@ -757,10 +1457,13 @@ class TallyDataExtractor:
           Negative amount = Debit entry  (ISDEEMEDPOSITIVE=Yes)
           Positive amount = Credit entry (ISDEEMEDPOSITIVE=No)
         """
+        # Voucher types, party and ledger names repeat across thousands of
+        # vouchers in an export; interning keeps one copy of each string
+        # instead of a fresh one per voucher/entry.
         vch = {
             "voucher_number": "",
             "company": self.company_name,
-            "voucher_type": vch_elem.get("VCHTYPE", ""),
+            "voucher_type": sys.intern(vch_elem.get("VCHTYPE", "")),
             "date": "",
             "party_name": "",
             "particulars": "",  # Matches Tally Day Book "Particulars" column
@@ -768,76 +1471,176 @@ class TallyDataExtractor:
             "amount": 0.0,
             "ledger_entries": [],
         }
+        # Entry totals accumulate as the entries are read, in integer paise
+        # so a many-line voucher sums exactly
+        debit_paise = credit_paise = 0
+        # Bound once per voucher rather than looked up per child / entry
+        entries = vch["ledger_entries"]
+        add_entry = entries.append
+        intern = sys.intern
 
         for child in vch_elem:
             tag = child.tag
+
+            # Entries first: they outnumber the header fields, and their own
+            # text is only whitespace, so it isn't read
+            if tag == "ALLLEDGERENTRIES.LIST":
+                # Tally puts dozens of other fields in each entry; look up the
+                # three we use directly rather than testing every child's tag.
+                # Keys are added in the order Tally emits the fields.
+                find = child.findtext
+                entry = {}
+                e_val = find("LEDGERNAME")
+                if e_val is not None:
+                    entry["ledger_name"] = intern(e_val.strip())
+                e_val = find("ISDEEMEDPOSITIVE")
+                if e_val is not None:
+                    entry["is_debit"] = e_val.strip().lower() in ("yes", "true")
+                e_val = find("AMOUNT")
+                if e_val is not None:
+                    # Empty AMOUNTs are common and plain digits the norm: skip
+                    # the raise for the former, the copy for the latter
+                    e_val = e_val.strip()
+                    raw_amt = 0.0
+                    if e_val:
+                        try:
+                            raw_amt = float(e_val.replace(",", "") if "," in e_val else e_val)
+                        except ValueError:
+                            pass
+                    if raw_amt < 0:
+                        debit_paise -= round(raw_amt * 100)
+                    elif raw_amt > 0:
+                        credit_paise += round(raw_amt * 100)
+                    entry["amount"] = abs(raw_amt)
+                    entry["dr_cr"] = "Dr" if raw_amt < 0 else "Cr"
+                if entry:
+                    add_entry(entry)
+                continue
+
+            # One set lookup skips every other field Tally sends along
+            if tag not in _VOUCHER_HEADER_TAGS:
+                continue
             val = (child.text or "").strip()
 
             if tag == "VOUCHERNUMBER":
                 vch["voucher_number"] = val
             elif tag == "DATE":
                 vch["date"] = self.parse_tally_date(val)
-            elif tag in ("PARTYLEDGERNAME", "PARTYNAME"):
-                if val:
-                    vch["party_name"] = val
             elif tag == "NARRATION":
                 vch["narration"] = val
             elif tag == "VOUCHERTYPENAME":
-                vch["voucher_type"] = val
-            elif tag == "ALLLEDGERENTRIES.LIST":
-                entry = {}
-                for e_child in child:
-                    e_tag = e_child.tag
-                    e_val = (e_child.text or "").strip()
-                    if e_tag == "LEDGERNAME":
-                        entry["ledger_name"] = e_val
-                    elif e_tag == "AMOUNT":
-                        raw_amt = 0.0
-                        try:
-                            raw_amt = float(e_val.replace(",", ""))
-                        except (ValueError, AttributeError):
-                            pass
-                        entry["raw_amount"] = raw_amt
-                        entry["amount"] = abs(raw_amt)
-                        entry["dr_cr"] = "Dr" if raw_amt < 0 else "Cr"
-                    elif e_tag == "ISDEEMEDPOSITIVE":
-                        entry["is_debit"] = e_val.lower() in ("yes", "true")
-                if entry:
-                    vch["ledger_entries"].append(entry)
+                vch["voucher_type"] = intern(val)
+            elif val:  # PARTYLEDGERNAME / PARTYNAME
+                vch["party_name"] = intern(val)
 
-        debit_entries = [e for e in vch["ledger_entries"] if e.get("raw_amount", 0) < 0]
-        credit_entries = [e for e in vch["ledger_entries"] if e.get("raw_amount", 0) > 0]
-        debit_total = sum(abs(e.get("raw_amount", 0)) for e in debit_entries)
-        credit_total = sum(abs(e.get("raw_amount", 0)) for e in credit_entries)
-        vch["amount"] = debit_total or credit_total
+        vch["amount"] = (debit_paise or credit_paise) / 100
 
-        if vch["ledger_entries"]:
-            vch["particulars"] = vch["ledger_entries"][0].get("ledger_name", "")
+        if entries:
+            vch["particulars"] = entries[0].get("ledger_name", "")
 
         if not vch["party_name"] and vch["particulars"]:
             vch["party_name"] = vch["particulars"]
 
-        for entry in vch["ledger_entries"]:
-            entry.pop("raw_amount", None)
-
         return vch
 
-    def get_vouchers(
+    def _iter_filtered_vouchers(
+        self,
+        xml_resp: Union[str, _CleanXMLStream],
+        voucher_type: Optional[str],
+        filter_from: str,
+        filter_to: str,
+        include_entries: bool,
+        stats: Dict[str, int],
+    ) -> Iterator[Dict]:
+        """
+        Stream <VOUCHER> elements out of the response, applying the date/type
+        filters as we go. Skip counts are accumulated into `stats`.
+        """
+        check_date = bool(filter_from or filter_to)
+        type_lc = voucher_type.lower() if voucher_type else None
+        for vch_elem in _iter_xml(xml_resp, "VOUCHER"):
+            # ----------------------------------------------------------------
+            # Python-side date filtering (Tally XML date params are unreliable)
+            # Tally tends to return the whole book regardless of the range, so
+            # look at DATE before building the voucher dict and its entries.
+            # ----------------------------------------------------------------
+            if check_date:
+                vch_date = self.parse_tally_date((vch_elem.findtext("DATE") or "").strip())
+                if vch_date and (
+                    (filter_from and vch_date < filter_from)
+                    or (filter_to and vch_date > filter_to)
+                ):
+                    if (vch_elem.findtext("VOUCHERNUMBER") or "").strip():
+                        stats["skipped_date"] += 1
+                    continue
+
+            # Filter by voucher type if specified, also before parsing. The
+            # type is VOUCHERTYPENAME, or the VCHTYPE attribute without one,
+            # as in _parse_voucher_element. Case-insensitive; an exact match,
+            # the usual case, skips lower-casing the voucher's type.
+            if type_lc is not None:
+                vt = vch_elem.findtext("VOUCHERTYPENAME")
+                vt = vch_elem.get("VCHTYPE", "") if vt is None else vt.strip()
+                if vt != voucher_type and vt.lower() != type_lc:
+                    if (vch_elem.findtext("VOUCHERNUMBER") or "").strip():
+                        stats["skipped_type"] += 1
+                    continue
+
+            vch = self._parse_voucher_element(vch_elem)
+
+            if not vch["voucher_number"]:
+                continue
+
+            if not include_entries:
+                vch.pop("ledger_entries", None)
+
+            yield vch
+
+    def _iter_vouchers_from_xml(
+        self,
+        resp: requests.Response,
+        voucher_type: Optional[str],
+        filter_from: str,
+        filter_to: str,
+        include_entries: bool,
+        stats: Dict[str, int],
+    ) -> Iterator[Dict]:
+        """
+        Yield filtered vouchers from a streamed Collection export response,
+        closing it when done (or when the caller stops early).
+
+        Invalid character references and control characters are stripped as
+        the body is read, so a parse error here means a truncated or genuinely
+        malformed export. It raises TallyConnectionError rather than letting
+        the vouchers parsed so far, an arbitrary prefix, pass for the full list.
+        """
+        try:
+            yield from self._iter_filtered_vouchers(
+                _CleanXMLStream(resp), voucher_type, filter_from, filter_to, include_entries, stats,
+            )
+        except ET.ParseError as exc:
+            logger.error("XML parse error (vouchers): %s", exc)
+            raise TallyConnectionError(f"Voucher export truncated or malformed: {exc}") from exc
+        except requests.exceptions.RequestException as exc:
+            raise TallyConnectionError(f"Voucher export interrupted: {exc}") from exc
+        finally:
+            resp.close()
+
+    def iter_vouchers(
         self,
         voucher_type: Optional[str] = None,
         from_date: Optional[str] = None,
         to_date: Optional[str] = None,
-        limit: int = 500,
         include_entries: bool = False,
-    ) -> List[Dict]:
+        stats: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Dict]:
         """
-        Get vouchers using Collection Export with NATIVEMETHOD.
-
-        IMPORTANT: Tally may ignore SVFROMDATE/SVTODATE in collection exports.
-        We always apply Python-side date filtering after fetching to guarantee
-        correct results regardless of Tally version behavior.
+        Generator flavour of get_vouchers (no limit — slice it yourself).
 
-        Date params accept YYYYMMDD or YYYY-MM-DD format.
+        The Tally request runs eagerly, so connection errors raise here rather
+        than on first iteration; vouchers are then parsed lazily one at a time,
+        letting callers stream them out without building the full list.
+        Pass a dict as `stats` to collect skipped_date / skipped_type counts.
         """
         fd = from_date or self.fy_start
         td = to_date or self.fy_end
@@ -846,95 +1649,53 @@ class TallyDataExtractor:
         filter_from = self._normalize_date_param(fd)
         filter_to = self._normalize_date_param(td)
 
-        xml_request = f"""
-        <ENVELOPE>
-            <HEADER>
-                <VERSION>1</VERSION>
-                <TALLYREQUEST>Export</TALLYREQUEST>
-                <TYPE>Collection</TYPE>
-                <ID>VchCollection</ID>
-            </HEADER>
-            <BODY>
-                <DESC>
-                    <STATICVARIABLES>
-                        <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                        <SVCURRENTCOMPANY>{self.company_name}</SVCURRENTCOMPANY>
-                        <SVFROMDATE>{fd}</SVFROMDATE>
-                        <SVTODATE>{td}</SVTODATE>
-                    </STATICVARIABLES>
-                    <TDL>
-                        <TDLMESSAGE>
-                            <COLLECTION NAME="VchCollection">
-                                <TYPE>Voucher</TYPE>
-                                <NATIVEMETHOD>VoucherNumber, VoucherTypeName, Date,
-                                              Amount, PartyLedgerName, Narration</NATIVEMETHOD>
-                                <NATIVEMETHOD>AllLedgerEntries</NATIVEMETHOD>
-                            </COLLECTION>
-                        </TDLMESSAGE>
-                    </TDL>
-                </DESC>
-            </BODY>
-        </ENVELOPE>"""
+        xml_request = _VCH_COLLECTION_XML.format(company=self.company_name, fd=fd, td=td)
 
-        xml_resp = self._execute_request(xml_request, timeout=120)
-        if not xml_resp:
+        # Streamed: vouchers are parsed as the body arrives, so the export is
+        # never held whole in memory and a limited caller stops the download
+        resp = self._execute_request_stream(xml_request, timeout=120)
+        if resp is None:
             logger.warning("Voucher collection export failed — no response from Tally")
             raise TallyConnectionError(
                 "Cannot connect to Tally. Please ensure Tally Prime is running."
             )
 
-        try:
-            root = ET.fromstring(xml_resp)
-        except ET.ParseError as exc:
-            logger.error("XML parse error (vouchers): %s", exc)
-            try:
-                cleaned = re.sub(r'&#x[0-9a-fA-F]+;', '', xml_resp)
-                cleaned = re.sub(r'&#\d+;', '', cleaned)
-                root = ET.fromstring(cleaned)
-                logger.info("Parsed vouchers after aggressive XML cleaning")
-            except ET.ParseError as exc2:
-                logger.error("XML parse still failed after cleaning: %s", exc2)
-                return []
-
-        vouchers = []
-        skipped_date = 0
-        skipped_type = 0
-
-        for vch_elem in root.iter("VOUCHER"):
-            vch = self._parse_voucher_element(vch_elem)
-
-            if not vch["voucher_number"]:
-                continue
-
-            # ----------------------------------------------------------------
-            # Python-side date filtering (Tally XML date params are unreliable)
-            # ----------------------------------------------------------------
-            vch_date = vch.get("date", "")  # Already YYYY-MM-DD from parse_tally_date
-            if vch_date:
-                if filter_from and vch_date < filter_from:
-                    skipped_date += 1
-                    continue
-                if filter_to and vch_date > filter_to:
-                    skipped_date += 1
-                    continue
-
-            # Filter by voucher type if specified
-            if voucher_type and vch.get("voucher_type", "").lower() != voucher_type.lower():
-                skipped_type += 1
-                continue
+        if stats is None:
+            stats = {}
+        stats.update(skipped_date=0, skipped_type=0)
+        return self._iter_vouchers_from_xml(
+            resp, voucher_type, filter_from, filter_to, include_entries, stats,
+        )
 
-            if not include_entries:
-                vch.pop("ledger_entries", None)
+    def get_vouchers(
+        self,
+        voucher_type: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        limit: int = 500,
+        include_entries: bool = False,
+    ) -> List[Dict]:
+        """
+        Get vouchers using Collection Export with NATIVEMETHOD.
 
-            vouchers.append(vch)
+        IMPORTANT: Tally may ignore SVFROMDATE/SVTODATE in collection exports.
+        We always apply Python-side date filtering after fetching to guarantee
+        correct results regardless of Tally version behavior.
 
-            if len(vouchers) >= limit:
-                break
+        Date params accept YYYYMMDD or YYYY-MM-DD format.
+        Parsing stops as soon as `limit` vouchers have been kept.
+        """
+        stats: Dict[str, int] = {}
+        vouchers = list(itertools.islice(
+            self.iter_vouchers(voucher_type, from_date, to_date, include_entries, stats), limit,
+        ))
 
         logger.info(
             "Extracted %d vouchers (type=%s, %s to %s) | skipped_date=%d skipped_type=%d | via %s",
-            len(vouchers), voucher_type or "ALL", filter_from, filter_to,
-            skipped_date, skipped_type, self._method.value,
+            len(vouchers), voucher_type or "ALL",
+            self._normalize_date_param(from_date or self.fy_start),
+            self._normalize_date_param(to_date or self.fy_end),
+            stats["skipped_date"], stats["skipped_type"], self._method.value,
         )
         return vouchers
 
@@ -955,29 +1716,78 @@ class TallyDataExtractor:
         )
 
     # Convenience shortcuts
+    def get_vouchers_grouped(self, from_date=None, to_date=None) -> Dict[str, List[Dict]]:
+        """
+        All vouchers in the date window, keyed by lower-cased voucher type.
+
+        One Tally export serves every per-type shortcut below; the result is
+        memoised per window for 60 seconds so a dashboard pulling sales,
+        purchases, receipts, ... only hits Tally once. Concurrent callers for
+        a window share the export already in flight.
+        """
+        key = (
+            self._normalize_date_param(from_date or self.fy_start),
+            self._normalize_date_param(to_date or self.fy_end),
+        )
+        with self._vch_group_lock:
+            hit = self._vch_group_cache.get(key)
+            if hit and (time.time() - hit[0]) < self._vch_group_ttl:
+                return hit[1]
+            window_lock = self._vch_group_pending.setdefault(key, threading.Lock())
+
+        # Callers that arrive while this window is being exported wait here,
+        # then pick up the memoised result instead of starting their own export
+        with window_lock:
+            hit = self._vch_group_cache.get(key)
+            if hit and (time.time() - hit[0]) < self._vch_group_ttl:
+                return hit[1]
+            try:
+                grouped: Dict[str, List[Dict]] = {}
+                for vch in self.iter_vouchers(from_date=from_date, to_date=to_date):
+                    grouped.setdefault(vch.get("voucher_type", "").lower(), []).append(vch)
+
+                now = time.time()
+                with self._vch_group_lock:
+                    # Drop expired windows so the memo doesn't grow without bound
+                    for k in [k for k, (ts, _) in self._vch_group_cache.items() if (now - ts) >= self._vch_group_ttl]:
+                        self._vch_group_cache.pop(k, None)
+                    self._vch_group_cache[key] = (now, grouped)
+            finally:
+                with self._vch_group_lock:
+                    self._vch_group_pending.pop(key, None)
+
+        logger.info(
+            "Grouped %d voucher types (%s to %s) via %s",
+            len(grouped), key[0], key[1], self._method.value,
+        )
+        return grouped
+
+    def _vouchers_of_type(self, voucher_type: str, from_date=None, to_date=None, limit: int = 500):
+        return self.get_vouchers_grouped(from_date, to_date).get(voucher_type.lower(), [])[:limit]
+
     def get_sales_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Sales", from_date, to_date)
+        return self._vouchers_of_type("Sales", from_date, to_date)
 
     def get_purchase_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Purchase", from_date, to_date)
+        return self._vouchers_of_type("Purchase", from_date, to_date)
 
     def get_receipt_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Receipt", from_date, to_date)
+        return self._vouchers_of_type("Receipt", from_date, to_date)
 
     def get_payment_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Payment", from_date, to_date)
+        return self._vouchers_of_type("Payment", from_date, to_date)
 
     def get_journal_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Journal", from_date, to_date)
+        return self._vouchers_of_type("Journal", from_date, to_date)
 
     def get_contra_vouchers(self, from_date=None, to_date=None):
-        return self.get_vouchers("Contra", from_date, to_date)
+        return self._vouchers_of_type("Contra", from_date, to_date)
 
     def get_credit_notes(self, from_date=None, to_date=None):
-        return self.get_vouchers("Credit Note", from_date, to_date)
+        return self._vouchers_of_type("Credit Note", from_date, to_date)
 
     def get_debit_notes(self, from_date=None, to_date=None):
-        return self.get_vouchers("Debit Note", from_date, to_date)
+        return self._vouchers_of_type("Debit Note", from_date, to_date)
 
     def get_day_book(self, date: Optional[str] = None) -> List[Dict]:
         """
@@ -1021,70 +1831,131 @@ class TallyDataExtractor:
         for led in self.get_all_ledgers():
             grp = led.get("parent_group", "Unknown")
             if grp not in summary:
-                summary[grp] = {"count": 0, "total_opening_balance": 0.0,
-                                "total_closing_balance": 0.0, "total_net_movement": 0.0}
+                summary[grp] = {"count": 0, "total_opening_balance": 0,
+                                "total_closing_balance": 0, "total_net_movement": 0}
             s = summary[grp]
             s["count"] += 1
-            o = led.get("opening_balance", 0)
-            c = led.get("closing_balance", 0)
+            # Totals run in integer paise; balances carry two decimals
+            o = round(led.get("opening_balance", 0) * 100)
+            c = round(led.get("closing_balance", 0) * 100)
             s["total_opening_balance"] += o if led.get("opening_dr_cr") == "Dr" else -o
             s["total_closing_balance"] += c if led.get("closing_dr_cr") == "Dr" else -c
-            s["total_net_movement"] += led.get("net_movement", 0)
+            s["total_net_movement"] += round(led.get("net_movement", 0) * 100)
+        for s in summary.values():
+            for key in ("total_opening_balance", "total_closing_balance", "total_net_movement"):
+                s[key] /= 100
         return summary
 
     def get_financial_summary(self) -> Dict:
         ledgers = self.get_all_ledgers()
-        asset_groups = {"Bank Accounts", "Cash-in-Hand", "Fixed Assets", "Sundry Debtors",
-                        "Deposits (Asset)", "Loans & Advances (Asset)", "Investments"}
-        liability_groups = {"Sundry Creditors", "Secured Loans", "Unsecured Loans",
-                            "Capital Account", "Reserves & Surplus", "Duties & Taxes",
-                            "Current Liabilities", "Provisions"}
-
-        summary = {"total_ledgers": len(ledgers), "total_assets": 0.0, "total_liabilities": 0.0,
-                    "total_receivables": 0.0, "total_payables": 0.0, "total_bank_balance": 0.0,
-                    "total_cash_balance": 0.0, "total_loans": 0.0, "total_fixed_assets": 0.0,
-                    "extraction_method": self._method.value}
 
+        # Only the ledgers under these groups matter: bucket them in one pass
+        # instead of testing every ledger against every group. Built from
+        # this list rather than the shared _ledger_by_group, which a
+        # concurrent refresh or invalidate_cache() may swap out meanwhile.
+        by_group: Dict[str, List[Dict]] = {}
         for led in ledgers:
-            grp = led.get("parent_group", "")
-            closing = led.get("closing_balance", 0)
-            dc = led.get("closing_dr_cr", "Dr")
-            signed = closing if dc == "Dr" else -closing
-
-            if grp in asset_groups: summary["total_assets"] += signed
-            if grp in liability_groups: summary["total_liabilities"] += abs(signed)
-            if grp == "Sundry Debtors": summary["total_receivables"] += closing
-            if grp == "Sundry Creditors": summary["total_payables"] += closing
-            if grp == "Bank Accounts": summary["total_bank_balance"] += closing
-            if grp == "Cash-in-Hand": summary["total_cash_balance"] += closing
-            if grp in ("Secured Loans", "Unsecured Loans"): summary["total_loans"] += closing
-            if grp == "Fixed Assets": summary["total_fixed_assets"] += closing
-        return summary
+            grp = led.get("parent_group")
+            if grp in _ASSET_GROUPS or grp in _LIABILITY_GROUPS:
+                by_group.setdefault(grp, []).append(led)
+
+        def members(*groups):
+            return [led for grp in groups for led in by_group.get(grp, ())]
+
+        def closing(*groups):
+            return math.fsum(led.get("closing_balance", 0) for led in members(*groups))
 
+        def signed(led):
+            c = led.get("closing_balance", 0)
+            return c if led.get("closing_dr_cr", "Dr") == "Dr" else -c
+
+        return {
+            "total_ledgers": len(ledgers),
+            "total_assets": math.fsum(signed(led) for led in members(*_ASSET_GROUPS)),
+            "total_liabilities": math.fsum(abs(signed(led)) for led in members(*_LIABILITY_GROUPS)),
+            "total_receivables": closing("Sundry Debtors"),
+            "total_payables": closing("Sundry Creditors"),
+            "total_bank_balance": closing("Bank Accounts"),
+            "total_cash_balance": closing("Cash-in-Hand"),
+            "total_loans": closing("Secured Loans", "Unsecured Loans"),
+            "total_fixed_assets": closing("Fixed Assets"),
+            "extraction_method": self._method.value,
+        }
+
+    # nlargest keeps a heap of `limit` items instead of sorting every
+    # debtor/creditor; ties come out in list order, as with a stable sort
     def get_top_debtors(self, limit=10):
-        return sorted(self.get_debtors(), key=lambda x: x.get("closing_balance", 0), reverse=True)[:limit]
+        return heapq.nlargest(limit, self.get_debtors(), key=lambda x: x.get("closing_balance", 0))
 
     def get_top_creditors(self, limit=10):
-        return sorted(self.get_creditors(), key=lambda x: x.get("closing_balance", 0), reverse=True)[:limit]
+        return heapq.nlargest(limit, self.get_creditors(), key=lambda x: x.get("closing_balance", 0))
 
     # ========================================================================
     # UTILITY
     # ========================================================================
 
     def to_json(self, data) -> str:
+        if HAS_ORJSON:
+            try:
+                return orjson.dumps(
+                    data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                ).decode()
+            except orjson.JSONEncodeError:
+                pass  # e.g. ints beyond 64 bits; json handles those
         return json.dumps(data, indent=2, ensure_ascii=False, default=str)
 
     def get_extraction_method(self) -> str:
+        """
+        Method that served the last successful call. This is cached state,
+        updated by _post/_get_odbc_connection — it never probes Tally.
+        """
         return self._method.value
 
+    async def fetch_all_async(self) -> Dict:
+        """
+        Fetch company info, masters (ledgers, groups, cost centres — one
+        bundled report) and vouchers concurrently. Each blocking call runs in
+        a worker thread over the pooled keep-alive session, so total latency
+        is the slowest request rather than the sum.
+        """
+        company_info, masters, vouchers = await asyncio.gather(
+            asyncio.to_thread(self.get_company_info),
+            asyncio.to_thread(self.get_masters),
+            asyncio.to_thread(self.get_vouchers, limit=10000),
+        )
+        return {
+            "company_info": company_info,
+            "groups": masters["groups"],
+            "ledgers": masters["ledgers"],
+            "cost_centres": masters["cost_centres"],
+            "vouchers": vouchers,
+        }
+
+    def fetch_all(self) -> Dict:
+        """
+        Blocking counterpart of fetch_all_async. The same three calls run on a
+        short-lived thread pool rather than under asyncio.run, so this also
+        works from code that already has an event loop running (notebooks,
+        sync helpers called from async handlers).
+        """
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            fut_ci = pool.submit(self.get_company_info)
+            fut_masters = pool.submit(self.get_masters)
+            fut_v = pool.submit(self.get_vouchers, limit=10000)
+            masters = fut_masters.result()
+            return {
+                "company_info": fut_ci.result(),
+                "groups": masters["groups"],
+                "ledgers": masters["ledgers"],
+                "cost_centres": masters["cost_centres"],
+                "vouchers": fut_v.result(),
+            }
+
     def export_all(self) -> Dict:
         logger.info("Starting full export: %s", self.company_name)
         result = {
-            "company_info": self.get_company_info(),
-            "groups": self.get_all_groups(),
-            "ledgers": self.get_all_ledgers(),
-            "cost_centres": self.get_cost_centres(),
-            "vouchers": self.get_vouchers(limit=10000),
+            **self.fetch_all(),
+            # Derived from the ledger cache populated above
             "trial_balance": self.get_trial_balance(),
             "financial_summary": self.get_financial_summary(),
             "extraction_timestamp": datetime.now().isoformat(),